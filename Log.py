@@ -3,8 +3,14 @@ A simplified Python version of the TypeScript classes that are part of Advantage
 https://github.com/Mechanical-Advantage/AdvantageScope/blob/main/src/shared/log
 """
 
+import array
+import bisect
+import itertools
+import math
+import sys
+from collections import OrderedDict
 from enum import Enum
-from typing import Dict, List, Optional, Any, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Any, Sequence, Set, Tuple
 from dataclasses import dataclass, field
 import json
 import msgpack
@@ -12,11 +18,15 @@ from StructDecoder import StructDecoder
 
 __all__ = ["LoggableType", "LogValueSet", "LogValueSetRaw", "LogValueSetBoolean",
            "LogValueSetNumber", "LogValueSetString", "LogValueSetBooleanArray",
-           "LogValueSetNumberArray", "LogValueSetStringArray", "LogField",
-           "Log"]
+           "LogValueSetNumberArray", "LogValueSetStringArray", "RawValueArena",
+           "BooleanValueArray", "LogFieldTree", "LogField", "Log"]
 
 # === Core Types ===
 
+# Value sets are created for every range query, so use slotted dataclasses
+# where available (Python 3.10+) to skip the per-instance __dict__
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 class LoggableType(Enum):
     """Types of log data that can be stored."""
     RAW = "raw"
@@ -28,188 +38,513 @@ class LoggableType(Enum):
     STRING_ARRAY = "string_array"
     EMPTY = "empty"  # Placeholder for child fields of structured data
 
-@dataclass
+# Integer ids for each type (in definition order), which are cheaper to
+# compare than enum members on the put/get paths
+(_TYPE_RAW, _TYPE_BOOLEAN, _TYPE_NUMBER, _TYPE_STRING, _TYPE_BOOLEAN_ARRAY,
+ _TYPE_NUMBER_ARRAY, _TYPE_STRING_ARRAY, _TYPE_EMPTY) = range(len(LoggableType))
+_LOGGABLE_TYPES = list(LoggableType)
+_TYPE_IDS = {log_type: type_id for type_id, log_type in enumerate(_LOGGABLE_TYPES)}
+
+@dataclass(**_DATACLASS_OPTIONS)
 class LogValueSet:
     """Base class for log value sets."""
-    timestamps: List[float] = field(default_factory=list)
-    values: List[Any] = field(default_factory=list)
+    timestamps: Sequence[float] = field(default_factory=list)
+    values: Sequence[Any] = field(default_factory=list)
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class LogValueSetRaw(LogValueSet):
-    values: List[bytes] = field(default_factory=list)
+    values: Sequence[bytes] = field(default_factory=list)
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class LogValueSetBoolean(LogValueSet):
-    values: List[bool] = field(default_factory=list)
+    values: Sequence[bool] = field(default_factory=list)
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class LogValueSetNumber(LogValueSet):
-    values: List[float] = field(default_factory=list)
+    values: Sequence[float] = field(default_factory=list)
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class LogValueSetString(LogValueSet):
     values: List[str] = field(default_factory=list)
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class LogValueSetBooleanArray(LogValueSet):
     values: List[List[bool]] = field(default_factory=list)
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class LogValueSetNumberArray(LogValueSet):
-    values: List[List[float]] = field(default_factory=list)
+    values: List[Sequence[float]] = field(default_factory=list)
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class LogValueSetStringArray(LogValueSet):
     values: List[List[str]] = field(default_factory=list)
 
+class RawValueArena:
+    """A sequence of byte strings packed into one contiguous buffer.
+    
+    Raw fields receive a value for every sample, so rather than keeping a
+    separate bytes object for each one the data is appended to a single
+    bytearray and only the offset and length of each value are stored.
+    Values are returned as bytes.
+    
+    Offsets are stored relative to a fixed origin, with _base giving the
+    offset of the buffer's first byte, so removing a prefix only advances
+    _base instead of changing every offset. While the values are stored
+    back to back in order, slices copy a single span of the buffer.
+    """
+    
+    __slots__ = ("_arena", "_offsets", "_lengths", "_base", "_in_order")
+    
+    def __init__(self, values: Optional[Iterable[bytes]] = None):
+        self._arena = bytearray()
+        self._offsets = array.array("Q")
+        self._lengths = array.array("Q")
+        self._base = 0
+        self._in_order = True
+        if values:
+            for value in values:
+                self.append(value)
+    
+    def __len__(self) -> int:
+        return len(self._offsets)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._get_slice(index)
+        position = self._offsets[index] - self._base
+        return bytes(self._arena[position:position + self._lengths[index]])
+    
+    def _get_slice(self, index: slice) -> "RawValueArena":
+        """Returns the values in a slice as a new arena."""
+        start, stop, step = index.indices(len(self))
+        if step != 1 or not self._in_order:
+            return RawValueArena([self[i] for i in range(start, stop, step)])
+        output = RawValueArena()
+        if start < stop:
+            first_offset = self._offsets[start]
+            end_offset = self._offsets[stop - 1] + self._lengths[stop - 1]
+            output._arena = self._arena[first_offset - self._base:end_offset - self._base]
+            output._offsets = self._offsets[start:stop]
+            output._lengths = self._lengths[start:stop]
+            output._base = first_offset
+        return output
+    
+    def __iter__(self):
+        arena = self._arena
+        base = self._base
+        for offset, length in zip(self._offsets, self._lengths):
+            position = offset - base
+            yield bytes(arena[position:position + length])
+    
+    def __delitem__(self, index: slice) -> None:
+        start, stop, step = index.indices(len(self))
+        if start == 0 and step == 1 and self._in_order:
+            # Removing a prefix drops the start of the buffer, which is cheap
+            # for a bytearray, and leaves the remaining offsets as they are
+            if stop >= len(self):
+                self._arena = bytearray()
+                self._base = 0
+            else:
+                removed_bytes = self._offsets[stop] - self._base
+                del self._arena[:removed_bytes]
+                self._base += removed_bytes
+            del self._offsets[:stop]
+            del self._lengths[:stop]
+            return
+        
+        # Rebuild the buffer so the removed values do not keep using memory
+        remaining = list(self)
+        del remaining[index]
+        compacted = RawValueArena(remaining)
+        self._arena, self._offsets, self._lengths = compacted._arena, compacted._offsets, compacted._lengths
+        self._base, self._in_order = compacted._base, compacted._in_order
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (RawValueArena, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"RawValueArena({list(self)!r})"
+    
+    def append(self, value: bytes) -> None:
+        """Adds a value to the end of the sequence."""
+        offset = self._base + len(self._arena)
+        self._arena += value
+        self._offsets.append(offset)
+        self._lengths.append(len(value))
+    
+    def insert(self, index: int, value: bytes) -> None:
+        """Inserts a value before the index.
+        
+        The bytes are always appended to the end of the buffer, so only the
+        offset and length arrays need to shift.
+        """
+        if index >= len(self):
+            self.append(value)
+            return
+        offset = self._base + len(self._arena)
+        self._arena += value
+        self._offsets.insert(index, offset)
+        self._lengths.insert(index, len(value))
+        self._in_order = False
+
+class BooleanValueArray:
+    """A sequence of booleans stored as one byte each rather than as a list
+    of pointers. Values are returned as bools, and slices as lists of bools
+    since range results are indexed heavily."""
+    
+    __slots__ = ("_bytes",)
+    
+    def __init__(self, values: Optional[Sequence[bool]] = None):
+        self._bytes = bytearray(1 if value else 0 for value in values) if values else bytearray()
+    
+    def __len__(self) -> int:
+        return len(self._bytes)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(map(bool, self._bytes[index]))
+        return self._bytes[index] != 0
+    
+    def __delitem__(self, index: slice) -> None:
+        del self._bytes[index]
+    
+    def __iter__(self):
+        return map(bool, self._bytes)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BooleanValueArray):
+            return self._bytes == other._bytes
+        if isinstance(other, list):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"BooleanValueArray({list(self)!r})"
+    
+    def append(self, value: bool) -> None:
+        """Adds a value to the end of the sequence."""
+        self._bytes.append(1 if value else 0)
+    
+    def insert(self, index: int, value: bool) -> None:
+        """Inserts a value before the index."""
+        self._bytes.insert(index, 1 if value else 0)
+
+@dataclass(**_DATACLASS_OPTIONS)
+class LogFieldTree:
+    """A node in the tree of field keys, split on "/"."""
+    full_key: Optional[str] = None
+    children: Dict[str, "LogFieldTree"] = field(default_factory=dict)
+
+def _as_double_array(value: Sequence[float]) -> Optional[array.array]:
+    """Returns number array values as array('d'), the one type they are
+    stored as, or None if any item can't be converted to a double."""
+    if type(value) is array.array and value.typecode == "d":
+        return value
+    try:
+        return array.array("d", value)
+    except (TypeError, OverflowError):
+        return None
+
 # === Log Field ===
 
 class LogField:
     """A full log field that contains data."""
     
+    __slots__ = ("_type_id", "data", "structured_type", "type_warning", "_version", "_range_cache")
+    
+    RANGE_CACHE_SIZE = 16
+    
     def __init__(self, log_type: LoggableType):
-        self.type = log_type
-        self.data = LogValueSet()
+        self._type_id = _TYPE_IDS[log_type]
+        # Timestamps (and number values) are stored as packed doubles rather
+        # than lists of Python floats to reduce memory and boxing overhead.
+        # Raw values share one byte buffer and booleans take a byte each for
+        # the same reason.
+        if log_type == LoggableType.NUMBER:
+            values = array.array("d")
+        elif log_type == LoggableType.BOOLEAN:
+            values = BooleanValueArray()
+        elif log_type == LoggableType.RAW:
+            values = RawValueArena()
+        else:
+            values = []
+        self.data = LogValueSet(array.array("d"), values)
         self.structured_type: Optional[str] = None
         self.type_warning: bool = False
+        
+        # Indices of recently requested ranges, keyed by (start, end,
+        # version). The version is bumped on every mutation so stale entries
+        # never match.
+        self._version = 0
+        self._range_cache: "OrderedDict[Tuple[float, float, int], Tuple[int, int]]" = OrderedDict()
+    
+    @property
+    def type(self) -> LoggableType:
+        """The constant field type."""
+        return _LOGGABLE_TYPES[self._type_id]
+    
+    @type.setter
+    def type(self, log_type: LoggableType) -> None:
+        self._type_id = _TYPE_IDS[log_type]
     
     def get_type(self) -> LoggableType:
         """Returns the constant field type."""
-        return self.type
+        return _LOGGABLE_TYPES[self._type_id]
     
-    def get_timestamps(self) -> List[float]:
+    def get_timestamps(self) -> Sequence[float]:
         """Returns the full set of ordered timestamps."""
-        return self.data.timestamps.copy()
+        return self.data.timestamps[:]
+    
+    @property
+    def timestamp_count(self) -> int:
+        """The number of timestamps, without copying them."""
+        return len(self.data.timestamps)
+    
+    def get_last_timestamp(self) -> Optional[float]:
+        """Returns the most recent timestamp, or None if the field is empty."""
+        timestamps = self.data.timestamps
+        return timestamps[-1] if timestamps else None
     
     def clear_before_time(self, clear_timestamp: float) -> None:
         """Clears all data before the provided timestamp."""
-        i = 0
-        while i < len(self.data.timestamps):
-            if (len(self.data.timestamps) >= 2 and 
-                i + 1 < len(self.data.timestamps) and 
-                self.data.timestamps[i + 1] < clear_timestamp):
-                self.striping_reference = not self.striping_reference
-                i += 1
-                continue
-            
-            # Remove elements before index i
-            self.data.timestamps = self.data.timestamps[i:]
-            self.data.values = self.data.values[i:]
-            break
+        # Keep the last value before the clear timestamp since it is still
+        # active at that point
+        i = max(bisect.bisect_left(self.data.timestamps, clear_timestamp) - 1, 0)
+        if i > 0:
+            del self.data.timestamps[:i]
+            del self.data.values[:i]
+            self._version += 1
         
         # Adjust first timestamp if needed
         if (self.data.timestamps and 
             self.data.timestamps[0] < clear_timestamp):
             self.data.timestamps[0] = clear_timestamp
+            self._version += 1
     
     def get_range(self, start: float, end: float) -> LogValueSet:
-        """Returns values in the specified timestamp range."""
-        # Implement range retrieval with caching
-        result_timestamps = []
-        result_values = []
-        
-        for i, timestamp in enumerate(self.data.timestamps):
-            if start < timestamp <= end:
-                result_timestamps.append(timestamp)
-                result_values.append(self.data.values[i])
+        """Returns values in the specified timestamp range.
         
-        result = LogValueSet()
-        result.timestamps = result_timestamps
-        result.values = result_values
-        return result
+        The indices of recent ranges are cached, and every call returns newly
+        sliced sequences, so callers may modify them.
+        """
+        return LogValueSet(*self._get_range_data(start, end))
+    
+    def get_range_indices(self, start: float, end: float) -> Tuple[int, int]:
+        """Returns the start and end indices of the values after the start
+        timestamp and up to the end timestamp, without copying any data."""
+        timestamps = self.data.timestamps
+        # Check the field's bounds before searching, since most queries
+        # cover the whole field or miss it entirely
+        if not timestamps or start >= timestamps[-1] or end < timestamps[0]:
+            return 0, 0
+        if start < timestamps[0] and end >= timestamps[-1]:
+            return 0, len(timestamps)
+        start_index = bisect.bisect_right(timestamps, start)
+        # The end can only be at or after the start index
+        return start_index, bisect.bisect_right(timestamps, end, start_index)
+    
+    def get_values_by_index(self, start_index: int, end_index: int) -> Sequence[Any]:
+        """Returns the values between two indices from get_range_indices,
+        in the field's storage type."""
+        return self.data.values[start_index:end_index]
+    
+    def _get_range_data(self, start: float, end: float) -> Tuple[Sequence[float], Sequence[Any]]:
+        """Returns the (timestamps, values) slices for a timestamp range."""
+        cache_key = (start, end, self._version)
+        indices = self._range_cache.get(cache_key)
+        if indices is None:
+            indices = self._range_cache[cache_key] = self.get_range_indices(start, end)
+            if len(self._range_cache) > self.RANGE_CACHE_SIZE:
+                self._range_cache.popitem(last=False)
+        else:
+            self._range_cache.move_to_end(cache_key)
+        start_index, end_index = indices
+        data = self.data
+        return data.timestamps[start_index:end_index], data.values[start_index:end_index]
     
     # Specific type getters
     def get_raw(self, start: float, end: float) -> Optional[LogValueSetRaw]:
-        if self.type != LoggableType.RAW:
+        if self._type_id != _TYPE_RAW:
             return None
-        range_data = self.get_range(start, end)
-        return LogValueSetRaw(range_data.timestamps, range_data.values)
+        return LogValueSetRaw(*self._get_range_data(start, end))
     
     def get_boolean(self, start: float, end: float) -> Optional[LogValueSetBoolean]:
-        if self.type != LoggableType.BOOLEAN:
+        if self._type_id != _TYPE_BOOLEAN:
             return None
-        range_data = self.get_range(start, end)
-        return LogValueSetBoolean(range_data.timestamps, range_data.values)
+        return LogValueSetBoolean(*self._get_range_data(start, end))
     
     def get_number(self, start: float, end: float) -> Optional[LogValueSetNumber]:
-        if self.type != LoggableType.NUMBER:
+        if self._type_id != _TYPE_NUMBER:
             return None
-        range_data = self.get_range(start, end)
-        return LogValueSetNumber(range_data.timestamps, range_data.values)
+        return LogValueSetNumber(*self._get_range_data(start, end))
     
     def get_string(self, start: float, end: float) -> Optional[LogValueSetString]:
-        if self.type != LoggableType.STRING:
+        if self._type_id != _TYPE_STRING:
+            return None
+        return LogValueSetString(*self._get_range_data(start, end))
+    
+    def get_boolean_array(self, start: float, end: float) -> Optional[LogValueSetBooleanArray]:
+        if self._type_id != _TYPE_BOOLEAN_ARRAY:
             return None
-        range_data = self.get_range(start, end)
-        return LogValueSetString(range_data.timestamps, range_data.values)
+        return LogValueSetBooleanArray(*self._get_range_data(start, end))
+    
+    def get_number_array(self, start: float, end: float) -> Optional[LogValueSetNumberArray]:
+        if self._type_id != _TYPE_NUMBER_ARRAY:
+            return None
+        return LogValueSetNumberArray(*self._get_range_data(start, end))
+    
+    def get_string_array(self, start: float, end: float) -> Optional[LogValueSetStringArray]:
+        if self._type_id != _TYPE_STRING_ARRAY:
+            return None
+        return LogValueSetStringArray(*self._get_range_data(start, end))
     
     # Putters for different types
-    def put_raw(self, timestamp: float, value: bytes) -> None:
-        """Writes a new Raw value to the field."""
-        if self.type != LoggableType.RAW:
+    def put_raw(self, timestamp: float, value: bytes) -> bool:
+        """Writes a new Raw value to the field, returning whether the type matched."""
+        if self._type_id != _TYPE_RAW:
             self.type_warning = True
-            return
-        self._insert_value(timestamp, value)
+            return False
+        self._append_fast(timestamp, value)
+        return True
     
-    def put_boolean(self, timestamp: float, value: bool) -> None:
-        """Writes a new Boolean value to the field."""
-        if self.type != LoggableType.BOOLEAN:
+    def put_boolean(self, timestamp: float, value: bool) -> bool:
+        """Writes a new Boolean value to the field, returning whether the type matched."""
+        if self._type_id != _TYPE_BOOLEAN:
             self.type_warning = True
-            return
-        self._insert_value(timestamp, value)
+            return False
+        self._append_fast(timestamp, value)
+        return True
     
-    def put_number(self, timestamp: float, value: float) -> None:
-        """Writes a new Number value to the field."""
-        if self.type != LoggableType.NUMBER:
+    def put_number(self, timestamp: float, value: float) -> bool:
+        """Writes a new Number value to the field, returning whether the type matched.
+        
+        Values are stored as doubles, so a value that can't be converted to
+        one (such as a string) is treated as a conflicting type.
+        """
+        if self._type_id != _TYPE_NUMBER:
             self.type_warning = True
-            return
-        self._insert_value(timestamp, value)
+            return False
+        try:
+            self._append_fast(timestamp, value)
+        except (TypeError, OverflowError):
+            self.type_warning = True
+            return False
+        return True
     
-    def put_string(self, timestamp: float, value: str) -> None:
-        """Writes a new String value to the field."""
-        if self.type != LoggableType.STRING:
+    def put_number_batch(self, timestamps: Sequence[float], values: Sequence[float]) -> bool:
+        """Writes a batch of Number values with sorted timestamps to the field,
+        returning whether the type matched. Nothing is written if any value
+        can't be converted to a double."""
+        if self._type_id != _TYPE_NUMBER:
             self.type_warning = True
-            return
-        self._insert_value(timestamp, value)
+            return False
+        if len(timestamps) != len(values):
+            raise ValueError("Timestamps and values must have the same length")
+        if not timestamps:
+            return True
+        try:
+            values = array.array("d", values)
+        except (TypeError, OverflowError):
+            self.type_warning = True
+            return False
+        
+        data = self.data
+        if data.timestamps and timestamps[0] < data.timestamps[-1]:
+            # The batch overlaps existing data, so place each value
+            for timestamp, value in zip(timestamps, values):
+                self._append_fast(timestamp, value)
+        else:
+            data.timestamps.extend(timestamps)
+            data.values.extend(values)
+            self._version += 1
+        return True
     
-    def put_boolean_array(self, timestamp: float, value: List[bool]) -> None:
-        """Writes a new BooleanArray value to the field."""
-        if self.type != LoggableType.BOOLEAN_ARRAY:
+    def put_string(self, timestamp: float, value: str) -> bool:
+        """Writes a new String value to the field, returning whether the type matched."""
+        if self._type_id != _TYPE_STRING:
             self.type_warning = True
-            return
-        self._insert_value(timestamp, value)
+            return False
+        self._append_fast(timestamp, value)
+        return True
     
-    def put_number_array(self, timestamp: float, value: List[float]) -> None:
-        """Writes a new NumberArray value to the field."""
-        if self.type != LoggableType.NUMBER_ARRAY:
+    def put_boolean_array(self, timestamp: float, value: List[bool]) -> bool:
+        """Writes a new BooleanArray value to the field, returning whether the type matched."""
+        if self._type_id != _TYPE_BOOLEAN_ARRAY:
             self.type_warning = True
-            return
-        self._insert_value(timestamp, value)
+            return False
+        self._append_fast(timestamp, value)
+        return True
+    
+    def put_number_array(self, timestamp: float, value: Sequence[float]) -> bool:
+        """Writes a new NumberArray value to the field, returning whether the type matched.
+        
+        Values are stored as array('d'), so an array with an item that can't
+        be converted to a double is treated as a conflicting type.
+        """
+        if self._type_id != _TYPE_NUMBER_ARRAY:
+            self.type_warning = True
+            return False
+        value = _as_double_array(value)
+        if value is None:
+            self.type_warning = True
+            return False
+        self._append_fast(timestamp, value)
+        return True
     
-    def put_string_array(self, timestamp: float, value: List[str]) -> None:
-        """Writes a new StringArray value to the field."""
-        if self.type != LoggableType.STRING_ARRAY:
+    def put_string_array(self, timestamp: float, value: List[str]) -> bool:
+        """Writes a new StringArray value to the field, returning whether the type matched."""
+        if self._type_id != _TYPE_STRING_ARRAY:
             self.type_warning = True
+            return False
+        self._append_fast(timestamp, value)
+        return True
+    
+    def _append_fast(self, timestamp: float, value: Any) -> None:
+        """Appends a value, only searching for its position when out of order."""
+        data = self.data
+        timestamps = data.timestamps
+        if timestamps and timestamp < timestamps[-1]:
+            self._insert_value(timestamp, value)
             return
-        self._insert_value(timestamp, value)
+        # The value is added first, so a value the storage rejects leaves the
+        # field unchanged
+        data.values.append(value)
+        timestamps.append(timestamp)
+        self._version += 1
     
     def _insert_value(self, timestamp: float, value: Any) -> None:
         """Insert a value at the correct timestamp position."""
-        # Find insertion point
-        insert_index = len(self.data.timestamps)
-        for i, ts in enumerate(self.data.timestamps):
-            if ts > timestamp:
-                insert_index = i
-                break
-        
-        self.data.timestamps.insert(insert_index, timestamp)
-        self.data.values.insert(insert_index, value)
+        # Insert after any existing values with the same timestamp
+        data = self.data
+        insert_index = bisect.bisect_right(data.timestamps, timestamp)
+        data.values.insert(insert_index, value)
+        data.timestamps.insert(insert_index, timestamp)
+        self._version += 1
+
+# === Decoding Helpers ===
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _decode_json(value: str) -> Any:
+    """Equivalent to json.loads, calling the C scanner directly for the
+    common case of a document without surrounding whitespace."""
+    try:
+        decoded_value, end = _JSON_DECODER.scan_once(value, 0)
+    except StopIteration:
+        return json.loads(value)
+    if end != len(value):
+        return json.loads(value)
+    return decoded_value
 
 # === Main Log Class ===
 
 class Log:
     """Represents a collection of log fields."""
     
+    TIMESTAMP_SET_CACHE_SIZE = 16
+    
     def __init__(self):
         self.DEFAULT_TIMESTAMP_RANGE = (0.0, 10.0)
         self.msgpack_decoder = msgpack
@@ -217,93 +552,315 @@ class Log:
         
         self.fields: Dict[str, LogField] = {}
         self.generated_parents: Set[str] = set()
-        self.timestamp_range: Optional[Tuple[float, float]] = None
+        
+        # Memoized results of is_generated, cleared whenever the generated
+        # parents change
+        self._is_generated_cache: Dict[str, bool] = {}
+        
+        # Bounds of the timestamp range, kept as scalars so that updating them
+        # for every sample does not allocate. The range is unset while the
+        # minimum is above the maximum.
+        self._ts_min = math.inf
+        self._ts_max = -math.inf
+        
+        # Field keys organized by their "/"-separated parts, and the number
+        # of fields that are not generated. Both are kept up to date as
+        # fields and generated parents are added or removed.
+        self._field_tree = LogFieldTree()
+        self._field_count = 0
+        
+        # Interned child keys of structured fields ({parent: {child: key}}) so
+        # the same string is reused for every sample
+        self._child_keys: Dict[str, Dict[Any, str]] = {}
+        
+        # MessagePack and struct values whose children have not been decoded
+        # yet, keyed by the parent field. Each entry is (timestamp, value,
+        # schema type, is array), with no schema type for MessagePack.
+        self._pending_decode: Dict[str, List[Tuple[float, bytes, Optional[str], bool]]] = {}
+        
+        # The child schema types last registered below each struct field.
+        # Consecutive values almost always share them, so the placeholder
+        # child fields only need to be created once.
+        self._struct_schema_types: Dict[str, Dict[str, str]] = {}
+        
+        # Recently merged timestamp sets, keyed by the requested keys. Each
+        # entry is [fields generation, field versions, timestamps] and is
+        # only used while the generation and versions still match. Writes
+        # and clears through the log update the entries in place.
+        self._fields_generation = 0
+        self._timestamp_set_cache: "OrderedDict[Tuple[str, ...], List[Any]]" = OrderedDict()
+        
+        # The cached timestamp sets that include each field key
+        self._timestamp_sets_by_key: Dict[str, Set[Tuple[str, ...]]] = {}
     
     def create_blank_field(self, key: str, log_type: LoggableType) -> None:
         """Checks if the field exists and registers it if necessary."""
-        if key in self.fields:
-            return
-        self.fields[key] = LogField(log_type)
+        self._materialize_parents(key)
+        self._get_or_create_field(key, log_type)
+    
+    def _get_or_create_field(self, key: str, log_type: LoggableType) -> LogField:
+        """Returns the field for a key, registering a new one if necessary."""
+        field = self.fields.get(key)
+        if field is None:
+            key = sys.intern(key)
+            field = self.fields[key] = LogField(log_type)
+            self._register_key(key)
+        return field
+    
+    def _register_key(self, key: str) -> None:
+        """Adds a new field key to the field tree and count."""
+        self._fields_generation += 1
+        self._get_tree_node(key, True).full_key = key
+        if not self.is_generated(key):
+            self._field_count += 1
+    
+    def _get_tree_node(self, key: str, create: bool = False) -> Optional[LogFieldTree]:
+        """Returns the field tree node for a key, optionally creating it."""
+        node = self._field_tree
+        for part in key.split("/"):
+            if not part:
+                continue
+            child = node.children.get(part)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[part] = LogFieldTree()
+            node = child
+        return node
+    
+    def _get_descendant_keys(self, key: str) -> List[str]:
+        """Returns the keys of the fields below a key in the field tree."""
+        node = self._get_tree_node(key)
+        if node is None:
+            return []
+        output = []
+        stack = list(node.children.values())
+        while stack:
+            node = stack.pop()
+            if node.full_key is not None:
+                output.append(node.full_key)
+            stack.extend(node.children.values())
+        return output
+    
+    def _child_key(self, parent: str, child: Any) -> str:
+        """Returns the full key for a child of a structured field."""
+        children = self._child_keys.get(parent)
+        if children is None:
+            children = self._child_keys[parent] = {}
+        full_key = children.get(child)
+        if full_key is None:
+            full_key = children[child] = sys.intern(f"{parent}/{child}")
+        return full_key
     
     def delete_field(self, key: str) -> None:
         """Removes all data for a field."""
+        # Decode any queued parent values first, or they would recreate the
+        # field the next time it is read
+        self._materialize_parents(key)
+        if key in self._pending_decode:
+            self._decode_pending(key)
         if key in self.fields:
             del self.fields[key]
-            self.generated_parents.discard(key)
+            self._fields_generation += 1
+            self._struct_schema_types.clear()
+            for cache_key in list(self._timestamp_sets_by_key.get(key, ())):
+                self._remove_timestamp_set(cache_key)
+            if not self.is_generated(key):
+                self._field_count -= 1
+            
+            node = self._get_tree_node(key)
+            if node is not None and node.full_key == key:
+                node.full_key = None
+            
+            # Children that were only generated because of this key are
+            # counted again
+            if key in self.generated_parents:
+                children = [child for child in self._get_descendant_keys(key)
+                            if self.is_generated(child)]
+                self.generated_parents.discard(key)
+                self._is_generated_cache.clear()
+                self._field_count += sum(1 for child in children if not self.is_generated(child))
     
     def clear_before_time(self, timestamp: float) -> None:
         """Clears all data before the provided timestamp."""
-        if self.timestamp_range is None:
-            self.timestamp_range = (timestamp, timestamp)
-        elif self.timestamp_range[0] < timestamp:
-            new_end = max(timestamp, self.timestamp_range[1])
-            self.timestamp_range = (timestamp, new_end)
+        if self._ts_max < self._ts_min:
+            self._ts_min = self._ts_max = timestamp
+        elif self._ts_min < timestamp:
+            self._ts_min = timestamp
+            if self._ts_max < timestamp:
+                self._ts_max = timestamp
         
         # Clear field data
+        self.materialize()
+        valid_timestamp_sets = [(keys, entry) for keys, entry in self._timestamp_set_cache.items()
+                                if self._is_timestamp_set_merged(entry) and
+                                self._is_timestamp_set_valid(keys, entry)]
         for field in self.fields.values():
             field.clear_before_time(timestamp)
+        
+        # Every field keeps its last value before the clear timestamp, moved
+        # up to the clear timestamp, so the merged set does the same
+        for keys, entry in valid_timestamp_sets:
+            timestamps = entry[2]
+            index = bisect.bisect_right(timestamps, timestamp)
+            if index > 0:
+                timestamps[:index] = [timestamp]
+            entry[1] = self._get_field_versions(keys)
     
     def update_range_with_timestamp(self, timestamp: float) -> None:
         """Adjusts the timestamp range based on a known timestamp."""
-        if self.timestamp_range is None:
-            self.timestamp_range = (timestamp, timestamp)
-        else:
-            start, end = self.timestamp_range
-            new_start = min(start, timestamp)
-            new_end = max(end, timestamp)
-            self.timestamp_range = (new_start, new_end)
+        if timestamp < self._ts_min:
+            self._ts_min = timestamp
+        if timestamp > self._ts_max:
+            self._ts_max = timestamp
     
     def _process_timestamp(self, key: str, timestamp: float) -> None:
         """Updates the timestamp range and set caches if necessary."""
         self.update_range_with_timestamp(timestamp)
+        if key in self._timestamp_sets_by_key:
+            self._add_to_timestamp_sets(key, timestamp)
+    
+    def _add_to_timestamp_sets(self, key: str, timestamp: float) -> None:
+        """Inserts a newly written timestamp into the cached sets that include
+        the key, if the write was the only change since they were built."""
+        field = self.fields.get(key)
+        if field is None:
+            return
+        field_timestamps = field.data.timestamps
+        index = bisect.bisect_left(field_timestamps, timestamp)
+        if index == len(field_timestamps) or field_timestamps[index] != timestamp:
+            return
+        
+        for keys in self._timestamp_sets_by_key[key]:
+            entry = self._timestamp_set_cache[keys]
+            if entry[0] != self._fields_generation or not self._is_timestamp_set_merged(entry):
+                continue
+            versions = self._get_field_versions(keys)
+            changed = [i for i, (old, new) in enumerate(zip(entry[1], versions)) if old != new]
+            if not changed or any(keys[i] != key or versions[i] != entry[1][i] + 1 for i in changed):
+                continue
+            
+            timestamps = entry[2]
+            index = bisect.bisect_left(timestamps, timestamp)
+            if index == len(timestamps) or timestamps[index] != timestamp:
+                timestamps.insert(index, timestamp)
+            entry[1] = versions
+    
+    def _get_field_versions(self, keys: Sequence[str]) -> Tuple[int, ...]:
+        """Returns the version of each field, or -1 for missing fields."""
+        fields = self.fields
+        return tuple(fields[key]._version if key in fields else -1 for key in keys)
+    
+    def _is_timestamp_set_merged(self, entry: List[Any]) -> bool:
+        """Returns whether a cached timestamp set was merged from several
+        fields, rather than copied from a single field with duplicates."""
+        return sum(1 for version in entry[1] if version >= 0) > 1
+    
+    def _is_timestamp_set_valid(self, keys: Tuple[str, ...], entry: List[Any]) -> bool:
+        """Returns whether a cached timestamp set matches the current fields."""
+        return entry[0] == self._fields_generation and entry[1] == self._get_field_versions(keys)
     
     def get_field_keys(self) -> List[str]:
         """Returns an array of registered field keys."""
+        self.materialize()
         return list(self.fields.keys())
     
     def get_field_count(self) -> int:
         """Returns the count of fields (excluding array item fields)."""
-        return len([field for field in self.fields.keys() if not self.is_generated(field)])
+        return self._field_count
+    
+    def get_field_tree(self, include_generated: bool = True, prefix: str = "") -> Dict[str, LogFieldTree]:
+        """Returns the fields below a prefix organized as a tree.
+        
+        The returned tree is shared with the log when generated fields are
+        included, so it should be treated as read-only.
+        """
+        self.materialize()
+        node = self._get_tree_node(prefix)
+        if node is None:
+            return {}
+        if include_generated:
+            return node.children
+        return self._copy_tree_without_generated(node).children
+    
+    def _copy_tree_without_generated(self, node: LogFieldTree) -> LogFieldTree:
+        """Copies a field tree, leaving out generated fields."""
+        full_key = node.full_key
+        if full_key is not None and self.is_generated(full_key):
+            full_key = None
+        output = LogFieldTree(full_key)
+        if node.full_key not in self.generated_parents:
+            for name, child in node.children.items():
+                child_copy = self._copy_tree_without_generated(child)
+                if child_copy.full_key is not None or child_copy.children:
+                    output.children[name] = child_copy
+        return output
     
     def get_field(self, key: str) -> Optional[LogField]:
         """Returns the internal field object for a key."""
+        self._materialize_parents(key)
         return self.fields.get(key)
     
     def set_field(self, key: str, field: LogField) -> None:
         """Adds an existing log field to this log."""
+        self._materialize_parents(key)
+        is_new = key not in self.fields
+        if is_new:
+            key = sys.intern(key)
         self.fields[key] = field
+        if is_new:
+            self._register_key(key)
+        else:
+            self._fields_generation += 1
     
     def get_type(self, key: str) -> Optional[LoggableType]:
         """Returns the constant field type."""
+        self._materialize_parents(key)
         field = self.fields.get(key)
         return field.get_type() if field else None
     
     def get_structured_type(self, key: str) -> Optional[str]:
         """Returns the structured type string for a field."""
+        self._materialize_parents(key)
         field = self.fields.get(key)
         return field.structured_type if field else None
     
     def set_structured_type(self, key: str, type_str: Optional[str]) -> None:
         """Sets the structured type string for a field."""
+        self._materialize_parents(key)
         field = self.fields.get(key)
         if field:
             field.structured_type = type_str
     
     def get_type_warning(self, key: str) -> bool:
         """Returns whether there was an attempt to write a conflicting type to a field."""
+        self._materialize_parents(key)
         field = self.fields.get(key)
         return field.type_warning if field else False
             
     def is_generated(self, key: str) -> bool:
         """Returns whether the key is generated."""
-        return self.get_generated_parent(key) is not None
+        is_generated = self._is_generated_cache.get(key)
+        if is_generated is None:
+            is_generated = self._is_generated_cache[key] = self.get_generated_parent(key) is not None
+        return is_generated
     
     def get_generated_parent(self, key: str) -> Optional[str]:
         """If the key is generated, returns its parent."""
-        for parent_key in self.generated_parents:
-            if (len(key) > len(parent_key) + 1 and 
-                key.startswith(parent_key + "/")):
+        if not self.generated_parents:
+            return None
+        
+        # Probe each "/"-separated prefix of the key from the front rather
+        # than scanning every generated parent, so the outermost parent is
+        # found first. The child part of the key must be non-empty, so a
+        # trailing "/" is never a separator.
+        last_index = len(key) - 1
+        index = key.find("/", 0, last_index)
+        while index >= 0:
+            parent_key = key[:index]
+            if parent_key in self.generated_parents:
                 return parent_key
+            index = key.find("/", index + 1, last_index)
         return None
     
     def is_generated_parent(self, key: str) -> bool:
@@ -312,195 +869,462 @@ class Log:
     
     def set_generated_parent(self, key: str) -> None:
         """Sets the key to cause its children to be marked generated."""
-        self.generated_parents.add(key)
+        if key not in self.generated_parents:
+            # Existing children that were counted no longer are
+            children = [child for child in self._get_descendant_keys(key)
+                        if not self.is_generated(child)]
+            self.generated_parents.add(key)
+            self._is_generated_cache.clear()
+            self._field_count -= sum(1 for child in children if self.is_generated(child))
     
-    def get_timestamps(self, keys: List[str]) -> List[float]:
-        """Returns the combined timestamps from a set of fields."""
-        keys = [key for key in keys if key in self.fields]
+    def get_timestamps(self, keys: List[str]) -> Sequence[float]:
+        """Returns the combined timestamps from a set of fields.
         
-        if len(keys) > 1:
-            # Get new data
-            all_timestamps = []
+        Merged sets are cached and kept up to date by later writes and
+        clears, so every call returns a new copy of the cached list.
+        """
+        if self._pending_decode:
             for key in keys:
-                all_timestamps.extend(self.fields[key].get_timestamps())
-            output = sorted(list(set(all_timestamps)))
+                self._materialize_parents(key)
+        cache_key = tuple(keys)
+        cached = self._timestamp_set_cache.get(cache_key)
+        if cached is not None and self._is_timestamp_set_valid(cache_key, cached):
+            self._timestamp_set_cache.move_to_end(cache_key)
+            return cached[2][:]
+        fields = [self.fields[key] for key in keys if key in self.fields]
+        
+        if len(fields) > 1:
+            # Each field is already sorted, so sorting the concatenation is a
+            # merge of pre-sorted runs; duplicates are then adjacent
+            all_timestamps = []
+            for field in fields:
+                all_timestamps.extend(field.data.timestamps)
+            all_timestamps.sort()
+            output = [timestamp for timestamp, _ in itertools.groupby(all_timestamps)]
             
-        elif len(keys) == 1:
-            output = self.fields[keys[0]].get_timestamps()
+        elif len(fields) == 1:
+            output = fields[0].data.timestamps.tolist()
         else:
             output = []
         
-        return output
+        self._timestamp_set_cache[cache_key] = [
+            self._fields_generation, self._get_field_versions(cache_key), output]
+        if cached is None:
+            for key in cache_key:
+                self._timestamp_sets_by_key.setdefault(key, set()).add(cache_key)
+        else:
+            self._timestamp_set_cache.move_to_end(cache_key)
+        if len(self._timestamp_set_cache) > self.TIMESTAMP_SET_CACHE_SIZE:
+            self._remove_timestamp_set(next(iter(self._timestamp_set_cache)))
+        return output[:]
+    
+    def _remove_timestamp_set(self, cache_key: Tuple[str, ...]) -> None:
+        """Removes a cached timestamp set and its key references."""
+        del self._timestamp_set_cache[cache_key]
+        for key in cache_key:
+            cache_keys = self._timestamp_sets_by_key.get(key)
+            if cache_keys is not None:
+                cache_keys.discard(cache_key)
+                if not cache_keys:
+                    del self._timestamp_sets_by_key[key]
+    
+    @property
+    def timestamp_range(self) -> Optional[Tuple[float, float]]:
+        """The range of timestamps across all fields, or None if unset."""
+        if self._ts_max < self._ts_min:
+            return None
+        return (self._ts_min, self._ts_max)
+    
+    @timestamp_range.setter
+    def timestamp_range(self, timestamp_range: Optional[Tuple[float, float]]) -> None:
+        if timestamp_range is None:
+            self._ts_min, self._ts_max = math.inf, -math.inf
+        else:
+            self._ts_min, self._ts_max = timestamp_range
     
     def get_timestamp_range(self) -> Tuple[float, float]:
         """Returns the range of timestamps across all fields."""
-        if self.timestamp_range is None:
+        timestamp_range = self.timestamp_range
+        if timestamp_range is None:
             return self.DEFAULT_TIMESTAMP_RANGE
-        return self.timestamp_range
+        return timestamp_range
     
     def get_last_timestamp(self) -> float:
         """Returns the most recent timestamp across all fields."""
-        timestamps = self.get_timestamps(self.get_field_keys())
-        return timestamps[-1] if timestamps else 0.0
+        # Each field is sorted, so only the last timestamp of each is needed.
+        # Queued children always share their parent's timestamps, so there is
+        # no need to decode them here either.
+        last_timestamps = [timestamp for timestamp in map(LogField.get_last_timestamp, self.fields.values())
+                           if timestamp is not None]
+        return max(last_timestamps, default=0.0)
     
     # Data reading methods
     def get_range(self, key: str, start: float, end: float) -> Optional[LogValueSet]:
         """Reads a set of generic values from the field."""
+        self._materialize_parents(key)
         field = self.fields.get(key)
         return field.get_range(start, end) if field else None
     
     def get_raw(self, key: str, start: float, end: float) -> Optional[LogValueSetRaw]:
         """Reads a set of Raw values from the field."""
+        self._materialize_parents(key)
         field = self.fields.get(key)
         return field.get_raw(start, end) if field else None
     
     def get_boolean(self, key: str, start: float, end: float) -> Optional[LogValueSetBoolean]:
         """Reads a set of Boolean values from the field."""
+        self._materialize_parents(key)
         field = self.fields.get(key)
         return field.get_boolean(start, end) if field else None
     
     def get_number(self, key: str, start: float, end: float) -> Optional[LogValueSetNumber]:
         """Reads a set of Number values from the field."""
+        self._materialize_parents(key)
         field = self.fields.get(key)
         return field.get_number(start, end) if field else None
     
     def get_string(self, key: str, start: float, end: float) -> Optional[LogValueSetString]:
         """Reads a set of String values from the field."""
+        self._materialize_parents(key)
         field = self.fields.get(key)
         return field.get_string(start, end) if field else None
 
     def get_boolean_array(self, key: str, start: float, end: float) -> Optional[LogValueSetBooleanArray]:
         """Reads a set of BooleanArray values from the field."""
+        self._materialize_parents(key)
         field = self.fields.get(key)
         return field.get_boolean_array(start, end) if field else None
 
     def get_number_array(self, key: str, start: float, end: float) -> Optional[LogValueSetNumberArray]:
         """Reads a set of NumberArray values from the field."""
+        self._materialize_parents(key)
         field = self.fields.get(key)
         return field.get_number_array(start, end) if field else None
 
     def get_string_array(self, key: str, start: float, end: float) -> Optional[LogValueSetStringArray]:
         """Reads a set of StringArray values from the field."""
+        self._materialize_parents(key)
         field = self.fields.get(key)
         return field.get_string_array(start, end) if field else None
 
     # Data writing methods
-    def put_raw(self, key: str, timestamp: float, value: bytes) -> None:
-        """Writes a new Raw value to the field."""
-        self.create_blank_field(key, LoggableType.RAW)
-        self.fields[key].put_raw(timestamp, value)
-        if self.fields[key].get_type() == LoggableType.RAW:
-            self._process_timestamp(key, timestamp)
+    def _put_value(self, key: str, type_id: int, timestamp: float, value: Any) -> bool:
+        """Writes a value to a field of the given type id, returning whether
+        the type matched. Equivalent to the typed LogField putters, with the
+        type checked once against the field's type id."""
+        field = self.fields.get(key)
+        if field is None:
+            field = self._get_or_create_field(key, _LOGGABLE_TYPES[type_id])
+        elif field._type_id != type_id:
+            field.type_warning = True
+            return False
+        field._append_fast(timestamp, value)
+        self._process_timestamp(key, timestamp)
+        return True
     
-    def put_boolean(self, key: str, timestamp: float, value: bool) -> None:
-        """Writes a new Boolean value to the field."""
-        self.create_blank_field(key, LoggableType.BOOLEAN)
-        self.fields[key].put_boolean(timestamp, value)
-        if self.fields[key].get_type() == LoggableType.BOOLEAN:
-            self._process_timestamp(key, timestamp)
+    def put_raw(self, key: str, timestamp: float, value: bytes) -> bool:
+        """Writes a new Raw value to the field, returning whether the type matched."""
+        return self._put_value(key, _TYPE_RAW, timestamp, value)
     
-    def put_number(self, key: str, timestamp: float, value: float) -> None:
-        """Writes a new Number value to the field."""
-        self.create_blank_field(key, LoggableType.NUMBER)
-        self.fields[key].put_number(timestamp, value)
-        if self.fields[key].get_type() == LoggableType.NUMBER:
-            self._process_timestamp(key, timestamp)
+    def put_boolean(self, key: str, timestamp: float, value: bool) -> bool:
+        """Writes a new Boolean value to the field, returning whether the type matched."""
+        return self._put_value(key, _TYPE_BOOLEAN, timestamp, value)
     
-    def put_string(self, key: str, timestamp: float, value: str) -> None:
-        """Writes a new String value to the field."""
-        self.create_blank_field(key, LoggableType.STRING)
-        self.fields[key].put_string(timestamp, value)
-        if self.fields[key].get_type() == LoggableType.STRING:
+    def put_number(self, key: str, timestamp: float, value: float) -> bool:
+        """Writes a new Number value to the field, returning whether the type matched.
+        
+        Values are stored as doubles, so a value that can't be converted to
+        one (such as a string) is treated as a conflicting type.
+        """
+        field = self.fields.get(key)
+        if field is not None and field._type_id == _TYPE_NUMBER:
+            # Fast path for an existing field, equivalent to LogField.put_number
+            try:
+                field._append_fast(timestamp, value)
+            except (TypeError, OverflowError):
+                field.type_warning = True
+                return False
+            self._process_timestamp(key, timestamp)
+            return True
+        
+        if self._get_or_create_field(key, LoggableType.NUMBER).put_number(timestamp, value):
             self._process_timestamp(key, timestamp)
+            return True
+        return False
+    
+    def put_number_batch(self, key: str, timestamps: Sequence[float], values: Sequence[float]) -> bool:
+        """Writes a batch of Number values to the field, returning whether the
+        type matched. The timestamps must be sorted."""
+        field = self._get_or_create_field(key, LoggableType.NUMBER)
+        timestamp_sets = [(keys, self._timestamp_set_cache[keys])
+                          for keys in self._timestamp_sets_by_key.get(key, ())]
+        timestamp_sets = [(keys, entry) for keys, entry in timestamp_sets
+                          if self._is_timestamp_set_merged(entry) and
+                          self._is_timestamp_set_valid(keys, entry)]
+        if not field.put_number_batch(timestamps, values):
+            return False
+        if timestamps:
+            self.update_range_with_timestamp(timestamps[0])
+            self.update_range_with_timestamp(timestamps[-1])
+            
+            # Merge the batch into the cached sets that were current
+            for keys, entry in timestamp_sets:
+                all_timestamps = entry[2] + list(timestamps)
+                all_timestamps.sort()
+                entry[2][:] = [timestamp for timestamp, _ in itertools.groupby(all_timestamps)]
+                entry[1] = self._get_field_versions(keys)
+        return True
+    
+    def put_string(self, key: str, timestamp: float, value: str) -> bool:
+        """Writes a new String value to the field, returning whether the type matched."""
+        return self._put_value(key, _TYPE_STRING, timestamp, value)
+    
+    def put_boolean_array(self, key: str, timestamp: float, value: List[bool]) -> bool:
+        """Writes a new BooleanArray value to the field, returning whether the type matched."""
+        return self._put_value(key, _TYPE_BOOLEAN_ARRAY, timestamp, value)
+    
+    def put_number_array(self, key: str, timestamp: float, value: Sequence[float]) -> bool:
+        """Writes a new NumberArray value to the field, returning whether the type matched.
+        
+        Values are stored as array('d'), so an array with an item that can't
+        be converted to a double is treated as a conflicting type.
+        """
+        double_value = _as_double_array(value)
+        if double_value is None:
+            self._get_or_create_field(key, LoggableType.NUMBER_ARRAY).type_warning = True
+            return False
+        return self._put_value(key, _TYPE_NUMBER_ARRAY, timestamp, double_value)
+    
+    def put_string_array(self, key: str, timestamp: float, value: List[str]) -> bool:
+        """Writes a new StringArray value to the field, returning whether the type matched."""
+        return self._put_value(key, _TYPE_STRING_ARRAY, timestamp, value)
     
     def put_json(self, key: str, timestamp: float, value: str) -> None:
         """Writes a JSON-encoded string value to the field."""
-        self.put_string(key, timestamp, value)
-        if self.fields[key].get_type() == LoggableType.STRING:
+        if self.put_string(key, timestamp, value):
             self.set_generated_parent(key)
             self.set_structured_type(key, "JSON")
             try:
-                decoded_value = json.loads(value)
+                decoded_value = _decode_json(value)
                 self._put_unknown_struct(key, timestamp, decoded_value)
             except json.JSONDecodeError:
                 pass
     
     def put_msgpack(self, key: str, timestamp: float, value: bytes) -> None:
-        """Writes a msgpack-encoded raw value to the field."""
-        self.put_raw(key, timestamp, value)
-        if self.fields[key].get_type() == LoggableType.RAW:
+        """Writes a msgpack-encoded raw value to the field.
+        
+        The children are decoded the first time they are read.
+        """
+        if self.put_raw(key, timestamp, value):
             self.set_generated_parent(key)
             self.set_structured_type(key, "MessagePack")
-            try:
-                decoded_value = msgpack.unpackb(value, raw=False)
-                self._put_unknown_struct(key, timestamp, decoded_value)
-            except (msgpack.exceptions.ExtraData, ValueError):
-                pass
+            self._pending_decode.setdefault(key, []).append((timestamp, value, None, False))
     
     def put_struct(self, key: str, timestamp: float, value: bytes, schema_type: str, is_array: bool) -> None:
         """Writes a struct-encoded raw value to the field.
         
-        The schema type should not include "struct:" or "[]"
+        The schema type should not include "struct:" or "[]". The children
+        are decoded the first time they are read.
         """
-        self.put_raw(key, timestamp, value)
-        if self.fields[key].get_type() == LoggableType.RAW:
+        if self.put_raw(key, timestamp, value):
             self.set_generated_parent(key)
             self.set_structured_type(key, schema_type + ("[]" if is_array else ""))
-            decoded_data = None
+            self._pending_decode.setdefault(key, []).append((timestamp, value, schema_type, is_array))
+    
+    def materialize(self, key: Optional[str] = None) -> None:
+        """Decodes the queued MessagePack and struct values for a field, its
+        parents and its children, or for every field if no key is given."""
+        if not self._pending_decode:
+            return
+        if key is None:
+            parent_keys = list(self._pending_decode)
+        else:
+            self._materialize_parents(key)
+            prefix = key + "/"
+            parent_keys = [parent_key for parent_key in self._pending_decode
+                           if parent_key == key or parent_key.startswith(prefix)]
+        for parent_key in parent_keys:
+            self._decode_pending(parent_key)
+    
+    def _materialize_parents(self, key: str) -> None:
+        """Decodes the queued values of any structured field above the key."""
+        if not self._pending_decode:
+            return
+        index = key.rfind("/", 0, len(key) - 1)
+        while index >= 0:
+            parent_key = key[:index]
+            if parent_key in self._pending_decode:
+                self._decode_pending(parent_key)
+            index = key.rfind("/", 0, index)
+    
+    def _decode_pending(self, key: str) -> None:
+        """Writes the children of every queued value for a field."""
+        pending = self._pending_decode.pop(key)
+        
+        # Decode the struct values in one batch per schema, then write every
+        # value in the order it was queued
+        batches: Dict[Tuple[str, bool], List[int]] = {}
+        for index, (_, _, schema_type, is_array) in enumerate(pending):
+            if schema_type is not None:
+                batches.setdefault((schema_type, is_array), []).append(index)
+        decoded_structs: Dict[int, Optional[Dict[str, Any]]] = {}
+        for (schema_type, is_array), indices in batches.items():
             try:
-                if is_array:
-                    decoded_data = self.struct_decoder.decode_array(schema_type, value)
-                else:
-                    decoded_data = self.struct_decoder.decode(schema_type, value)
+                decoded_batch = self.struct_decoder.decode_batch(
+                    schema_type, [pending[index][1] for index in indices], is_array)
             except Exception:
-                pass
-            
-            if decoded_data is not None:
-                self._put_unknown_struct(key, timestamp, decoded_data["data"])
-                for child_key, child_schema_type in decoded_data["schema_types"].items():
-                    # Create the key so it can be dragged even though it doesn't have data
-                    full_child_key = f"{key}/{child_key}"
-                    self.create_blank_field(full_child_key, LoggableType.EMPTY)
-                    self._process_timestamp(full_child_key, timestamp)
-                    self.set_structured_type(full_child_key, child_schema_type)
+                continue
+            decoded_structs.update(zip(indices, decoded_batch))
+        
+        for index, (timestamp, value, schema_type, _) in enumerate(pending):
+            if schema_type is None:
+                self._put_msgpack_children(key, timestamp, value)
+            else:
+                self._put_struct_children(key, timestamp, decoded_structs.get(index))
+    
+    def _put_msgpack_children(self, key: str, timestamp: float, value: bytes) -> None:
+        """Decodes a msgpack value and writes it to the children of the field."""
+        try:
+            decoded_value = self.msgpack_decoder.unpackb(value, raw=False)
+            self._put_unknown_struct(key, timestamp, decoded_value)
+        except (msgpack.exceptions.ExtraData, ValueError):
+            pass
+    
+    def _put_struct_children(self, key: str, timestamp: float,
+                             decoded_data: Optional[Dict[str, Any]]) -> None:
+        """Writes a decoded struct value to the children of the field."""
+        if decoded_data is not None:
+            self._put_unknown_struct(key, timestamp, decoded_data["data"])
+            schema_types = decoded_data["schema_types"]
+            if not schema_types or self._struct_schema_types.get(key) == schema_types:
+                return
+            self._struct_schema_types[key] = schema_types
+            for child_key, child_schema_type in schema_types.items():
+                # Create the key so it can be dragged even though it doesn't have data
+                full_child_key = self._child_key(key, child_key)
+                self.create_blank_field(full_child_key, LoggableType.EMPTY)
+                self._process_timestamp(full_child_key, timestamp)
+                self.set_structured_type(full_child_key, child_schema_type)
     
     def _put_unknown_struct(self, key: str, timestamp: float, value: Any, 
                            allow_root_write: bool = False) -> None:
         """Writes an unknown array or object to the children of the field."""
-        if value is None:
-            return
-        
-        # Handle primitive types
-        if isinstance(value, bool) and allow_root_write:
+        putter = self._UNKNOWN_PUTTERS.get(type(value))
+        if putter is None:
+            # Fall back to isinstance checks for subclasses of the known types
+            for value_type, type_putter in self._UNKNOWN_PUTTERS.items():
+                if isinstance(value, value_type):
+                    putter = type_putter
+                    break
+            else:
+                return
+        putter(self, key, timestamp, value, allow_root_write)
+    
+    # Primitive types are only written when the value is a child of a struct
+    def _put_unknown_boolean(self, key: str, timestamp: float, value: bool,
+                             allow_root_write: bool) -> None:
+        if allow_root_write:
             self.put_boolean(key, timestamp, value)
-            return
-        elif isinstance(value, (int, float)) and allow_root_write:
+    
+    def _put_unknown_number(self, key: str, timestamp: float, value: float,
+                            allow_root_write: bool) -> None:
+        if allow_root_write:
             self.put_number(key, timestamp, float(value))
-            return
-        elif isinstance(value, str) and allow_root_write:
+    
+    def _put_unknown_string(self, key: str, timestamp: float, value: str,
+                            allow_root_write: bool) -> None:
+        if allow_root_write:
             self.put_string(key, timestamp, value)
-            return
-        elif isinstance(value, bytes) and allow_root_write:
+    
+    def _put_unknown_raw(self, key: str, timestamp: float, value: bytes,
+                         allow_root_write: bool) -> None:
+        if allow_root_write:
             self.put_raw(key, timestamp, value)
-            return
-        
-        # Handle arrays and objects
-        if isinstance(value, list):
-            # Check if all items are the same type for array handling
-            if all(isinstance(item, bool) for item in value) and allow_root_write:
+    
+    def _put_unknown_list(self, key: str, timestamp: float, value: List[Any],
+                          allow_root_write: bool) -> None:
+        if allow_root_write:
+            # Most arrays hold a single concrete type, which only needs an
+            # identity check per item
+            first_type = type(value[0]) if value else bool
+            item_types = self._ARRAY_ITEM_TYPES.get(first_type)
+            uniform = (item_types is not None and
+                       all(type(item) is first_type for item in value))
+            
+            # Otherwise classify the items in one pass, stopping at the first
+            # item that rules out all of the typed arrays
+            if not uniform:
+                item_types = 0
+            for item in () if uniform else value:
+                item_type = type(item)
+                if item_type is bool:
+                    item_types |= 1
+                elif item_type is float or item_type is int:
+                    item_types |= 2
+                elif item_type is str:
+                    item_types |= 4
+                elif isinstance(item, bool):
+                    item_types |= 1
+                elif isinstance(item, (int, float)):
+                    item_types |= 2
+                elif isinstance(item, str):
+                    item_types |= 4
+                else:
+                    item_types = 8
+                    break
+                if item_types & 4 and item_types & 3:
+                    break
+            
+            if item_types <= 1:
                 self.put_boolean_array(key, timestamp, value)
-            elif all(isinstance(item, (int, float)) for item in value) and allow_root_write:
-                self.put_number_array(key, timestamp, [float(x) for x in value])
-            elif all(isinstance(item, str) for item in value) and allow_root_write:
+                return
+            elif item_types <= 3:
+                self.put_number_array(key, timestamp, value)
+                return
+            elif item_types == 4:
                 self.put_string_array(key, timestamp, value)
+                return
+        
+        # Add array items as unknown structs
+        self.put_number(self._child_key(key, "length"), timestamp, len(value))
+        self._put_unknown_children(key, timestamp, enumerate(value))
+    
+    def _put_unknown_dict(self, key: str, timestamp: float, value: Dict[Any, Any],
+                          allow_root_write: bool) -> None:
+        # Add object entries
+        self._put_unknown_children(key, timestamp, value.items())
+    
+    def _put_unknown_children(self, key: str, timestamp: float, items: Iterable[Tuple[Any, Any]]) -> None:
+        """Writes (child, value) pairs below the field.
+        
+        This is the innermost loop of struct ingest, so the child key cache
+        and putter table are read directly instead of through _child_key and
+        _put_unknown_struct.
+        """
+        child_keys = self._child_keys.get(key)
+        if child_keys is None:
+            child_keys = self._child_keys[key] = {}
+        putters = self._UNKNOWN_PUTTERS
+        for child, child_value in items:
+            child_key = child_keys.get(child)
+            if child_key is None:
+                child_key = self._child_key(key, child)
+            putter = putters.get(type(child_value))
+            if putter is None:
+                self._put_unknown_struct(child_key, timestamp, child_value, True)
             else:
-                # Add array items as unknown structs
-                self.put_number(f"{key}/length", timestamp, len(value))
-                for i, item in enumerate(value):
-                    self._put_unknown_struct(f"{key}/{i}", timestamp, item, True)
-        elif isinstance(value, dict):
-            # Add object entries
-            for obj_key, obj_value in value.items():
-                self._put_unknown_struct(f"{key}/{obj_key}", timestamp, obj_value, True)
+                putter(self, child_key, timestamp, child_value, True)
     
+    # Bit flags for the item types of typed arrays
+    _ARRAY_ITEM_TYPES = {bool: 1, int: 2, float: 2, str: 4}
     
+    # Checked in order by the isinstance fallback, so bool must precede int
+    _UNKNOWN_PUTTERS = {
+        bool: _put_unknown_boolean,
+        int: _put_unknown_number,
+        float: _put_unknown_number,
+        str: _put_unknown_string,
+        bytes: _put_unknown_raw,
+        list: _put_unknown_list,
+        dict: _put_unknown_dict,
+    }
@@ -13,10 +13,12 @@ Converted from the TypeScript version at:
 https://github.com/Mechanical-Advantage/AdvantageScope/blob/main/src/shared/log/StructDecoder.ts
 """
 
+import json
+import re
 import struct
+import sys
 from enum import Enum
-from typing import Dict, List, Tuple, Any, Optional, Union
-import math
+from typing import Callable, Dict, List, Set, Tuple, Any, Optional, Union
 
 __all__ = ["StructDecoder"]
 
@@ -38,9 +40,12 @@ class ValueType(Enum):
     FLOAT64 = "float64"
 
 
-VALID_TYPE_STRINGS = [vt.value for vt in ValueType]
+VALID_TYPE_STRINGS = frozenset(vt.value for vt in ValueType)
 
-BITFIELD_VALID_TYPES = [
+# Value types by their type string, for resolving without the Enum lookup
+_VALUE_TYPES = {vt.value: vt for vt in ValueType}
+
+BITFIELD_VALID_TYPES = frozenset([
     ValueType.BOOL,
     ValueType.INT8,
     ValueType.INT16,
@@ -50,7 +55,7 @@ BITFIELD_VALID_TYPES = [
     ValueType.UINT16,
     ValueType.UINT32,
     ValueType.UINT64
-]
+])
 
 VALUE_TYPE_MAX_BITS = {
     ValueType.BOOL: 8,
@@ -69,8 +74,47 @@ VALUE_TYPE_MAX_BITS = {
     ValueType.FLOAT64: 64
 }
 
+# The same tables keyed by type string, so compiling schemas never needs
+# the ValueType members
+_TYPE_BITS_BY_STR = {vt.value: bits for vt, bits in VALUE_TYPE_MAX_BITS.items()}
+_BITFIELD_VALID_STRS = frozenset(vt.value for vt in BITFIELD_VALID_TYPES)
+
+# Format characters for the types that can be unpacked directly by the
+# struct module (chars are decoded byte by byte instead)
+VALUE_TYPE_FORMATS = {
+    ValueType.BOOL: "?",
+    ValueType.INT8: "b",
+    ValueType.INT16: "h",
+    ValueType.INT32: "i",
+    ValueType.INT64: "q",
+    ValueType.UINT8: "B",
+    ValueType.UINT16: "H",
+    ValueType.UINT32: "I",
+    ValueType.UINT64: "Q",
+    ValueType.FLOAT: "f",
+    ValueType.FLOAT32: "f",
+    ValueType.DOUBLE: "d",
+    ValueType.FLOAT64: "d"
+}
+
+# One value in a schema: an optional enum, the type, the name and an optional
+# bitfield width or array length
+_VALUE_SCHEMA_RE = re.compile(
+    r"\s*(?:enum\s*\{(?P<enum>[^}]*)\}\s*)?"
+    r"(?P<type>[^\s{}:\[\]]+)\s+(?P<name>[^\s:\[\]]+)\s*"
+    r"(?::\s*(?P<bitfield_width>\d+)|\[\s*(?P<array_length>\d+)\s*\])?\s*")
+_ENUM_PAIR_RE = re.compile(r"([^\s,=]+)\s*=\s*(\d+)")
+
+# Precompiled unpack functions and sizes for the numeric types
+_UNPACKERS = {value_type: struct.Struct("<" + value_format).unpack_from
+              for value_type, value_format in VALUE_TYPE_FORMATS.items()
+              if value_type != ValueType.BOOL}
+_VALUE_SIZES = {value_type: VALUE_TYPE_MAX_BITS[value_type] // 8 for value_type in _UNPACKERS}
+
 
 class ValueSchema:
+    __slots__ = ("name", "type", "enum", "bitfield_width", "array_length", "bit_range")
+
     def __init__(self, name: str, type_: Union[ValueType, str], enum: Optional[Dict[int, str]] = None,
                  bitfield_width: Optional[int] = None, array_length: Optional[int] = None,
                  bit_range: Tuple[int, int] = (0, 0)):
@@ -83,93 +127,162 @@ class ValueSchema:
 
 
 class Schema:
+    __slots__ = ("length", "value_schemas")
+
     def __init__(self, length: int, value_schemas: List[ValueSchema]):
         self.length = length
         self.value_schemas = value_schemas
 
 
+def _value_schema_from_serialized(vs_data: Dict[str, Any]) -> ValueSchema:
+    """Builds a value schema from its serialized dict."""
+    get = vs_data.get
+    enum = get('enum')
+    if enum is not None:
+        # JSON turns the integer keys into strings
+        enum = {int(key): value for key, value in enum.items()}
+    return ValueSchema(
+        name=sys.intern(vs_data['name']),
+        type_=sys.intern(vs_data['type']),
+        enum=enum,
+        bitfield_width=get('bitfield_width'),
+        array_length=get('array_length'),
+        bit_range=tuple(vs_data['bit_range'])
+    )
+
+
+def _schema_from_serialized(schema_data: Dict[str, Any]) -> Schema:
+    """Builds a schema from its serialized dict."""
+    return Schema(
+        length=schema_data['length'],
+        value_schemas=[vs_data if isinstance(vs_data, ValueSchema) else _value_schema_from_serialized(vs_data)
+                       for vs_data in schema_data['value_schemas']]
+    )
+
+
+def _build_serialized_node(node: Dict[str, Any]) -> Any:
+    """JSON object hook that builds tagged schemas as they are parsed."""
+    kind = node.get('__kind__')
+    if kind == 'ValueSchema':
+        return _value_schema_from_serialized(node)
+    if kind == 'Schema':
+        return _schema_from_serialized(node)
+    return node
+
+
 class StructDecoder:
     def __init__(self):
         self.schema_strings: Dict[str, str] = {}
         self.schemas: Dict[str, Schema] = {}
 
+        # Precompiled unpackers for schemas that only contain byte-aligned
+        # values, including through child structs, created the first time
+        # each schema is decoded. Each is the struct, the function that
+        # converts its unpacked tuple to an object and the child schema
+        # types, or None if the schema needs to be decoded bit by bit.
+        self._unpackers: Dict[str, Optional[Tuple[struct.Struct, Callable[[Tuple[Any, ...]], Dict[str, Any]], Dict[str, str]]]] = {}
+
+        # Per-value decode steps for each schema, created the first time it
+        # is decoded bit by bit. Each step is (name, value type or None for
+        # child structs, type string, enum, array length, bit range, array
+        # item length in bits).
+        self._decode_plans: Dict[str, List[Tuple[str, Optional[ValueType], str, Optional[Dict[int, str]], Optional[int], Tuple[int, int], int]]] = {}
+
+        # Uncompiled schemas with the struct types they are still waiting
+        # for, and the schemas waiting for each missing struct type
+        self._missing_dependencies: Dict[str, Set[str]] = {}
+        self._dependents: Dict[str, List[str]] = {}
+
     def add_schema(self, name: str, schema: bytes) -> None:
         schema_str = schema.decode('utf-8')
         if name in self.schema_strings:
             return
+        # Schema and value names repeat in every decoded object, so they are
+        # interned to share one string (interned strings live for the process)
+        name = sys.intern(name)
         self.schema_strings[name] = schema_str
+        self._compile_when_ready(name)
+
+    def _compile_when_ready(self, name: str) -> None:
+        """Compiles a schema if every struct it uses is compiled, then any
+        schemas that were only waiting for it. Otherwise the schema waits
+        for its missing dependencies."""
+        queue = [name]
+        while queue:
+            schema_name = queue.pop()
+            schema_str = self.schema_strings[schema_name]
+            missing = {type_ for type_ in self._get_struct_dependencies(schema_str)
+                       if type_ not in self.schemas}
+            if missing:
+                self._missing_dependencies[schema_name] = missing
+                for dependency in missing:
+                    self._dependents.setdefault(dependency, []).append(schema_name)
+                continue
+            if not self._compile_schema(schema_name, schema_str):
+                continue
+            
+            for dependent in self._dependents.pop(schema_name, []):
+                missing = self._missing_dependencies.get(dependent)
+                if missing is not None:
+                    missing.discard(schema_name)
+                    if not missing:
+                        del self._missing_dependencies[dependent]
+                        queue.append(dependent)
+
+    @staticmethod
+    def _parse_schema(schema: str) -> List["re.Match[str]"]:
+        """Splits a schema into the matches for each of its values. Values
+        that cannot be parsed are left out."""
+        matches = []
+        for value_schema_str in schema.split(";"):
+            match = _VALUE_SCHEMA_RE.fullmatch(value_schema_str)
+            if match is not None:
+                matches.append(match)
+        return matches
 
-        # Try to compile any missing schemas
-        while True:
-            compile_success = False
-            for schema_name in self.schema_strings.keys():
-                if schema_name not in self.schemas:
-                    success = self._compile_schema(schema_name, self.schema_strings[schema_name])
-                    compile_success = compile_success or success
-            if not compile_success:
-                # Nothing was compiled (either everything was already
-                # compiled or a schema dependency is missing)
-                break
+    @staticmethod
+    def _get_struct_dependencies(schema: str) -> Set[str]:
+        """Returns the struct types used by a schema."""
+        return {match["type"] for match in StructDecoder._parse_schema(schema)
+                if match["type"] not in VALID_TYPE_STRINGS}
 
     def _compile_schema(self, name: str, schema: str) -> bool:
-        value_schema_strs = [s for s in schema.strip().split(";") if len(s) > 0]
         value_schemas: List[ValueSchema] = []
         
-        for i in range(len(value_schema_strs)):
-            schema_str = value_schema_strs[i]
-
+        for match in self._parse_schema(schema):
             # Get enum data
             enum_data: Optional[Dict[int, str]] = None
-            if schema_str.startswith("enum"):
-                enum_data = {}
-                enum_str_start = schema_str.index("{") + 1
-                enum_str_end = schema_str.index("}")
-                enum_str = "".join([char for char in schema_str[enum_str_start:enum_str_end] if char != " "])
-                
-                for pair_str in [s for s in enum_str.split(",") if len(s) > 0]:
-                    pair = pair_str.split("=")
-                    if len(pair) == 2 and pair[1].isdigit():
-                        enum_data[int(pair[1])] = pair[0]
-                
-                schema_str = schema_str[enum_str_end + 1:]
+            enum_str = match["enum"]
+            if enum_str is not None:
+                enum_data = {int(value): sys.intern(enum_name)
+                             for enum_name, value in _ENUM_PAIR_RE.findall(enum_str)}
 
-            # Remove type from schema string
-            schema_str_split = [s for s in schema_str.split(" ") if len(s) > 0]
-            type_ = schema_str_split.pop(0)
+            type_ = match["type"]
             if type_ not in VALID_TYPE_STRINGS and type_ not in self.schemas:
                 # Missing struct, can't finish compiling
                 return False
-            name_str = "".join(schema_str_split)
 
-            # Get name and (bit length or array)
+            # Get bit length or array
             bitfield_width: Optional[int] = None
             array_length: Optional[int] = None
             
-            if ":" in name_str:
+            if match["bitfield_width"] is not None:
                 # Bitfield
-                split = name_str.split(":")
-                field_name = split[0]
-                bitfield_width = int(split[1])
+                bitfield_width = int(match["bitfield_width"])
 
                 # Check for invalid bitfield
-                value_type = ValueType(type_) if type_ in VALID_TYPE_STRINGS else None
-                if value_type not in BITFIELD_VALID_TYPES:
+                if type_ not in _BITFIELD_VALID_STRS:
                     continue
-                if value_type == ValueType.BOOL and bitfield_width != 1:
+                if type_ == "bool" and bitfield_width != 1:
                     continue
-            elif "[" in name_str:
+            elif match["array_length"] is not None:
                 # Array
-                split = name_str.split("[")
-                field_name = split[0]
-                array_length = int(split[1].split("]")[0])
-            else:
-                # Normal value
-                field_name = name_str
+                array_length = int(match["array_length"])
 
             # Create schema
             value_schemas.append(ValueSchema(
-                name=field_name,
-                type_=type_,
+                name=sys.intern(match["name"]),
+                type_=sys.intern(type_),
                 enum=enum_data,
                 bitfield_width=bitfield_width,
                 array_length=array_length,
@@ -200,21 +313,19 @@ class StructDecoder:
                     bit_position += bitfield_length - bitfield_position
                 bitfield_position = None
                 bitfield_length = None
-                value_type = ValueType(value_schema.type)
-                bit_length = VALUE_TYPE_MAX_BITS[value_type]
+                bit_length = _TYPE_BITS_BY_STR[value_schema.type]
                 if value_schema.array_length is not None:
                     bit_length *= value_schema.array_length
                 value_schema.bit_range = (bit_position, bit_position + bit_length)
                 bit_position += bit_length
             else:
                 # Bitfield value
-                value_type = ValueType(value_schema.type)
-                type_length = VALUE_TYPE_MAX_BITS[value_type]
+                type_length = _TYPE_BITS_BY_STR[value_schema.type]
                 value_bit_length = min(value_schema.bitfield_width, type_length)
                 
                 if (bitfield_position is None or
                     bitfield_length is None or
-                    (value_type != ValueType.BOOL and bitfield_length != type_length) or
+                    (value_schema.type != "bool" and bitfield_length != type_length) or
                     bitfield_position + value_bit_length > bitfield_length):
                     # Start new bitfield
                     if bitfield_position is not None and bitfield_length is not None:
@@ -243,49 +354,173 @@ class StructDecoder:
         if bit_length is None:
             bit_length = len(value) * 8
         
+        unpacker = self._get_unpacker(name)
+        if unpacker is not None and len(value) >= unpacker[0].size:
+            return {
+                "data": unpacker[1](unpacker[0].unpack_from(value)),
+                "schema_types": dict(unpacker[2])
+            }
+        
         output_data: Dict[str, Any] = {}
         output_schema_types: Dict[str, str] = {}
-        schema = self.schemas[name]
         
-        for value_schema in schema.value_schemas:
-            value_array, value_bit_length = self._slice_bits(value, value_schema.bit_range)
+        for value_name, value_type, type_name, enum_data, array_length, bit_range, item_length in self._get_decode_plan(name):
+            value_array, value_bit_length = self._slice_bits(value, bit_range)
             
-            if value_schema.type in VALID_TYPE_STRINGS:
-                value_type = ValueType(value_schema.type)
-                if value_schema.array_length is None:
+            if value_type is not None:
+                if array_length is None:
                     # Normal type
-                    output_data[value_schema.name] = self._decode_value(value_array, value_type, value_schema.enum)
+                    output_data[value_name] = self._decode_value(value_array, value_type, enum_data)
                 else:
                     # Array type
                     decoded_values: List[Any] = []
-                    item_length = (value_schema.bit_range[1] - value_schema.bit_range[0]) // value_schema.array_length
                     for position in range(0, value_bit_length, item_length):
                         item_value, _ = self._slice_bits(value_array, (position, position + item_length))
-                        decoded_values.append(self._decode_value(item_value, value_type, value_schema.enum))
+                        decoded_values.append(self._decode_value(item_value, value_type, enum_data))
                     
                     if value_type == ValueType.CHAR:
-                        output_data[value_schema.name] = "".join(decoded_values)
+                        output_data[value_name] = "".join(decoded_values)
                     else:
-                        output_data[value_schema.name] = decoded_values
+                        output_data[value_name] = decoded_values
             else:
                 # Child struct
-                is_array = value_schema.array_length is not None
-                output_schema_types[value_schema.name] = value_schema.type + ("[]" if is_array else "")
+                is_array = array_length is not None
+                output_schema_types[value_name] = type_name + ("[]" if is_array else "")
                 
                 if is_array:
-                    child = self.decode_array(value_schema.type, value_array, value_schema.array_length)
+                    child = self.decode_array(type_name, value_array, array_length)
                 else:
-                    child = self.decode(value_schema.type, value_array, value_bit_length)
+                    child = self.decode(type_name, value_array, value_bit_length)
                 
-                output_data[value_schema.name] = child["data"]
+                output_data[value_name] = child["data"]
                 for field, schema_type in child["schema_types"].items():
-                    output_schema_types[f"{value_schema.name}/{field}"] = schema_type
+                    output_schema_types[f"{value_name}/{field}"] = schema_type
 
         return {
             "data": output_data,
             "schema_types": output_schema_types
         }
 
+    def _get_decode_plan(self, name: str) -> List[Tuple[str, Optional[ValueType], str, Optional[Dict[int, str]], Optional[int], Tuple[int, int], int]]:
+        """Returns the decode steps for a schema, resolving the value types
+        and array item lengths once."""
+        plan = self._decode_plans.get(name)
+        if plan is None:
+            plan = []
+            for value_schema in self.schemas[name].value_schemas:
+                value_type = _VALUE_TYPES.get(value_schema.type)
+                array_length = value_schema.array_length
+                bit_range = value_schema.bit_range
+                item_length = (bit_range[1] - bit_range[0]) // array_length if array_length else 0
+                plan.append((value_schema.name, value_type, value_schema.type, value_schema.enum,
+                             array_length, bit_range, item_length))
+            self._decode_plans[name] = plan
+        return plan
+
+    def _get_unpacker(self, name: str) -> Optional[Tuple[struct.Struct, Callable[[Tuple[Any, ...]], Dict[str, Any]], Dict[str, str]]]:
+        """Returns the precompiled unpacker for a schema, if it has one."""
+        if name not in self._unpackers:
+            self._unpackers[name] = self._compile_unpacker(name)
+        return self._unpackers[name]
+
+    def _compile_unpacker(self, name: str) -> Optional[Tuple[struct.Struct, Callable[[Tuple[Any, ...]], Dict[str, Any]], Dict[str, str]]]:
+        """Builds a single struct for a schema whose values are all plain
+        numbers or booleans, or returns None if it has any other values.
+
+        Child structs are included in the same struct when they are flat
+        themselves, so nested schemas like Pose2d decode without recursion.
+        The struct is paired with a function generated for the schema that
+        converts its unpacked tuple to an object.
+        """
+        namespace: Dict[str, Any] = {}
+        flattened = self._flatten_schema(name, 0, namespace)
+        if flattened is None:
+            return None
+        formats, source, schema_types, _ = flattened
+        exec("def convert(v):\n    return " + source + "\n", namespace)
+        return struct.Struct("<" + "".join(formats)), namespace["convert"], schema_types
+
+    def _flatten_schema(self, name: str, position: int,
+                        namespace: Dict[str, Any]) -> Optional[Tuple[List[str], str, Dict[str, str], int]]:
+        """Returns the struct formats, converter source, child schema types and
+        unpacked value count for a schema whose values start at `position` in
+        the unpacked tuple "v", or None if it cannot be unpacked as one struct.
+        Enums used by the source are added to the namespace."""
+        schema = self.schemas[name]
+        formats: List[str] = []
+        items: List[str] = []
+        schema_types: Dict[str, str] = {}
+        start_position = position
+        bit_position = 0
+        for value_schema in schema.value_schemas:
+            if value_schema.bitfield_width is not None or value_schema.bit_range[0] != bit_position:
+                return None
+            bit_position = value_schema.bit_range[1]
+            count = value_schema.array_length
+            
+            if value_schema.type not in VALID_TYPE_STRINGS:
+                # Child struct, inlined item by item
+                child_name = value_schema.type
+                if child_name not in self.schemas:
+                    return None
+                child_sources = []
+                for i in range(1 if count is None else count):
+                    child = self._flatten_schema(child_name, position, namespace)
+                    if child is None:
+                        return None
+                    child_formats, child_source, child_schema_types, child_count = child
+                    formats.extend(child_formats)
+                    child_sources.append(child_source)
+                    position += child_count
+                    
+                    # Same order as the types from decode and decode_array
+                    if count is None:
+                        schema_types[value_schema.name] = child_name
+                        prefix = value_schema.name + "/"
+                    else:
+                        if i == 0:
+                            schema_types[value_schema.name] = child_name + "[]"
+                        prefix = f"{value_schema.name}/{i}/"
+                    for child_key, child_schema_type in child_schema_types.items():
+                        schema_types[prefix + child_key] = child_schema_type
+                    if count is not None:
+                        schema_types[f"{value_schema.name}/{i}"] = child_name
+                if count is None:
+                    item = child_sources[0]
+                else:
+                    if count == 0:
+                        schema_types[value_schema.name] = child_name + "[]"
+                    item = "[" + ", ".join(child_sources) + "]"
+                items.append(f"{value_schema.name!r}: {item}")
+                continue
+            
+            value_format = VALUE_TYPE_FORMATS.get(_VALUE_TYPES[value_schema.type])
+            if value_format is None:
+                return None
+            formats.append(value_format if count is None else str(count) + value_format)
+            
+            # Source for this value, reading from the unpacked tuple "v"
+            enum_name = None
+            if value_schema.enum is not None:
+                enum_name = f"enum{len(namespace)}"
+                namespace[enum_name] = value_schema.enum
+            if count is None:
+                item = f"v[{position}]"
+                if enum_name is not None:
+                    item = f"{enum_name}.get({item}, {item})"
+                position += 1
+            else:
+                item = f"v[{position}:{position + count}]"
+                if enum_name is not None:
+                    item = f"[{enum_name}.get(x, x) for x in {item}]"
+                else:
+                    item = f"list({item})"
+                position += count
+            items.append(f"{value_schema.name!r}: {item}")
+        if bit_position != schema.length:
+            return None
+        return formats, "{" + ", ".join(items) + "}", schema_types, position - start_position
+
     def decode_array(self, name: str, value: bytes, array_length: Optional[int] = None) -> Dict[str, Any]:
         """Converts struct-encoded data with a known array schema to an object."""
         if name not in self.schemas:
@@ -296,6 +531,28 @@ class StructDecoder:
         schema_length = self.schemas[name].length // 8
         length = len(value) // schema_length if array_length is None else array_length
         
+        # Flat schemas unpack every item in one pass over the buffer
+        unpacker = self._get_unpacker(name)
+        if (unpacker is not None and 0 < unpacker[0].size == schema_length and
+                len(value) >= length * schema_length):
+            packer, convert, item_schema_types = unpacker
+            buffer = value
+            if len(value) != length * schema_length:
+                # Trim the trailing bytes without copying the items
+                buffer = memoryview(value)[:length * schema_length]
+            output_data = list(map(convert, packer.iter_unpack(buffer)))
+            if item_schema_types:
+                for i in range(length):
+                    for item_key, item_schema_type in item_schema_types.items():
+                        output_schema_types[f"{i}/{item_key}"] = item_schema_type
+                    output_schema_types[str(i)] = name
+            else:
+                output_schema_types = {str(i): name for i in range(length)}
+            return {
+                "data": output_data,
+                "schema_types": output_schema_types
+            }
+        
         for i in range(length):
             start_idx = i * schema_length
             end_idx = (i + 1) * schema_length
@@ -311,38 +568,36 @@ class StructDecoder:
             "schema_types": output_schema_types
         }
 
+    def decode_batch(self, name: str, values: List[bytes], is_array: bool = False) -> List[Optional[Dict[str, Any]]]:
+        """Converts several struct-encoded values with the same schema to
+        objects. Values that cannot be decoded are returned as None."""
+        if name not in self.schemas:
+            raise ValueError("Schema not defined")
+        decode = self.decode_array if is_array else self.decode
+        
+        output: List[Optional[Dict[str, Any]]] = []
+        for value in values:
+            try:
+                output.append(decode(name, value))
+            except Exception:
+                output.append(None)
+        return output
+
     @staticmethod
     def _decode_value(value: bytes, value_type: ValueType, enum_data: Optional[Dict[int, str]]) -> Any:
         """Decode a bytes array as a single value based on the known type."""
-        max_bits = VALUE_TYPE_MAX_BITS[value_type]
-        padded_value = value + b'\x00' * (max_bits // 8 - len(value))
-        
         if value_type == ValueType.BOOL:
-            output = padded_value[0] > 0
+            output = len(value) > 0 and value[0] > 0
         elif value_type == ValueType.CHAR:
             output = value.decode('utf-8', errors='ignore')
-        elif value_type == ValueType.INT8:
-            output = struct.unpack('<b', padded_value[:1])[0]
-        elif value_type == ValueType.INT16:
-            output = struct.unpack('<h', padded_value[:2])[0]
-        elif value_type == ValueType.INT32:
-            output = struct.unpack('<i', padded_value[:4])[0]
-        elif value_type == ValueType.INT64:
-            output = struct.unpack('<q', padded_value[:8])[0]
-        elif value_type == ValueType.UINT8:
-            output = struct.unpack('<B', padded_value[:1])[0]
-        elif value_type == ValueType.UINT16:
-            output = struct.unpack('<H', padded_value[:2])[0]
-        elif value_type == ValueType.UINT32:
-            output = struct.unpack('<I', padded_value[:4])[0]
-        elif value_type == ValueType.UINT64:
-            output = struct.unpack('<Q', padded_value[:8])[0]
-        elif value_type in (ValueType.FLOAT, ValueType.FLOAT32):
-            output = struct.unpack('<f', padded_value[:4])[0]
-        elif value_type in (ValueType.DOUBLE, ValueType.FLOAT64):
-            output = struct.unpack('<d', padded_value[:8])[0]
         else:
-            raise ValueError(f"Unknown value type: {value_type}")
+            unpacker = _UNPACKERS.get(value_type)
+            if unpacker is None:
+                raise ValueError(f"Unknown value type: {value_type}")
+            size = _VALUE_SIZES[value_type]
+            if len(value) < size:
+                value = value.ljust(size, b'\x00')
+            output = unpacker(value)[0]
 
         if enum_data is not None and output in enum_data:
             output = enum_data[output]
@@ -355,47 +610,40 @@ class StructDecoder:
         start_bit, end_bit = bit_range
         if start_bit % 8 == 0 and end_bit % 8 == 0:
             return input_bytes[start_bit // 8:end_bit // 8], end_bit - start_bit
-        else:
-            bool_array = StructDecoder._to_bool_array(input_bytes)
-            sliced_bool_array = bool_array[start_bit:end_bit]
-            return StructDecoder._to_bytes_array(sliced_bool_array), end_bit - start_bit
-
-    @staticmethod
-    def _to_bool_array(values: bytes) -> List[bool]:
-        """Convert a bytes array to an array of booleans for each bit."""
-        output: List[bool] = []
-        for value in values:
-            for shift in range(8):
-                output.append(((1 << shift) & value) > 0)
-        return output
-
-    @staticmethod
-    def _to_bytes_array(values: List[bool]) -> bytes:
-        """Convert an array of booleans to a bytes array."""
-        array = bytearray(math.ceil(len(values) / 8))
-        for i, value in enumerate(values):
-            if value:
-                byte_idx = i // 8
-                bit_idx = i % 8
-                array[byte_idx] |= 1 << bit_idx
-        return bytes(array)
+        
+        # Read the bytes covering the range as one little-endian number, then
+        # shift and mask it down to the range. Bits past the end of the input
+        # are left out.
+        bit_count = min(end_bit, len(input_bytes) * 8) - start_bit
+        if bit_count <= 0:
+            return b"", end_bit - start_bit
+        value = int.from_bytes(input_bytes[start_bit // 8:(start_bit + bit_count + 7) // 8], "little")
+        value = (value >> (start_bit % 8)) & ((1 << bit_count) - 1)
+        return value.to_bytes((bit_count + 7) // 8, "little"), end_bit - start_bit
 
     def to_serialized(self) -> Dict[str, Any]:
         """Returns a serialized version of the data from this decoder."""
-        # Convert schemas to serializable format
+        # Convert schemas to serializable format, leaving out optional
+        # properties that are not set
         serialized_schemas = {}
         for name, schema in self.schemas.items():
             serialized_value_schemas = []
             for vs in schema.value_schemas:
-                serialized_value_schemas.append({
+                serialized_value_schema = {
+                    '__kind__': 'ValueSchema',
                     'name': vs.name,
                     'type': vs.type.value if isinstance(vs.type, ValueType) else vs.type,
-                    'enum': vs.enum,
-                    'bitfield_width': vs.bitfield_width,
-                    'array_length': vs.array_length,
                     'bit_range': vs.bit_range
-                })
+                }
+                if vs.enum is not None:
+                    serialized_value_schema['enum'] = vs.enum
+                if vs.bitfield_width is not None:
+                    serialized_value_schema['bitfield_width'] = vs.bitfield_width
+                if vs.array_length is not None:
+                    serialized_value_schema['array_length'] = vs.array_length
+                serialized_value_schemas.append(serialized_value_schema)
             serialized_schemas[name] = {
+                '__kind__': 'Schema',
                 'length': schema.length,
                 'value_schemas': serialized_value_schemas
             }
@@ -411,31 +659,30 @@ class StructDecoder:
         decoder = cls()
         decoder.schema_strings = serialized_data['schema_strings']
         
-        # Reconstruct schemas from serialized format
+        # Reconstruct schemas from serialized format. Types are kept as
+        # strings, the same as when schemas are compiled. Schemas built by
+        # `loads()` are used as they are.
         for name, schema_data in serialized_data['schemas'].items():
-            value_schemas = []
-            for vs_data in schema_data['value_schemas']:
-                # Convert type back to ValueType or keep as string
-                type_ = vs_data['type']
-                if type_ in VALID_TYPE_STRINGS:
-                    type_ = ValueType(type_)
-                
-                value_schemas.append(ValueSchema(
-                    name=vs_data['name'],
-                    type_=type_,
-                    enum=vs_data['enum'],
-                    bitfield_width=vs_data['bitfield_width'],
-                    array_length=vs_data['array_length'],
-                    bit_range=tuple(vs_data['bit_range'])
-                ))
-            
-            decoder.schemas[name] = Schema(
-                length=schema_data['length'],
-                value_schemas=value_schemas
-            )
+            if not isinstance(schema_data, Schema):
+                schema_data = _schema_from_serialized(schema_data)
+            decoder.schemas[name] = schema_data
+        
+        # Schemas that were still missing dependencies wait for them again
+        for name in decoder.schema_strings:
+            if name not in decoder.schemas:
+                decoder._compile_when_ready(name)
         
         return decoder
     
+    @classmethod
+    def loads(cls, data: Union[str, bytes]) -> 'StructDecoder':
+        """Creates a new decoder from the JSON encoding of `to_serialized()`.
+
+        Schemas are built while the JSON is parsed rather than in a second
+        pass over the parsed dicts.
+        """
+        return cls.from_serialized(json.loads(data, object_hook=_build_serialized_node))
+    
     # print schema strings and schemas for debugging
     def __str__(self) -> str:
         schema_strings_str = "\n".join(f"{name}: {schema}" for name, schema in self.schema_strings.items())
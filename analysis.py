@@ -1,13 +1,19 @@
 #! /usr/bin/env python3
 
+import array
+import contextlib
+import io
 import json
+import math
 import mmap
+import operator
 import os
 import sys
-import statistics
-from typing import Dict, List, Optional, Set, Tuple, Any, Union
-from datalog import DataLogReader
-from Log import Log, LoggableType
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Any, Union
+from datalog import DataLogReader, DataLogRecord
+from Log import Log, LogField, LoggableType
 
 # Constants for structured types
 STRUCT_PREFIX = "struct:"
@@ -15,16 +21,110 @@ STRUCT_PREFIX = "struct:"
 # Set to True for detailed output
 VERBOSE = False
 
+# Names of the LogField getters for the types that can be analyzed
+VALUES_GETTER_NAMES = {
+    LoggableType.STRING: "get_string",
+    LoggableType.BOOLEAN: "get_boolean",
+    LoggableType.NUMBER: "get_number",
+}
+
+
+def get_values_getter(field: LogField) -> Optional[Callable[[float, float], Any]]:
+    """Return the field's getter for values in a time range, or None if its type is not a string, boolean, or number."""
+    getter_name = VALUES_GETTER_NAMES.get(field.get_type())
+    return getattr(field, getter_name) if getter_name is not None else None
+
+def build_value_locators(results: List[Tuple[str, List[Union[int, float, str, bool]], List[float]]],
+                         use_abs: bool = False) -> List[Tuple[str, Dict[Any, int], List[float]]]:
+    """Map each value in every file to the index of its first occurrence.
+    
+    Args:
+        results: List of tuples containing log file name, data, and timestamps
+        use_abs: Whether to map the absolute values of the numeric data instead
+        
+    Returns:
+        List of tuples containing log file name, first index by value, and timestamps
+    """
+    locators = []
+    for log_file_name, file_data, timestamps in results:
+        if use_abs:
+            file_data = [abs(x) for x in file_data if isinstance(x, (int, float))]
+        first_indices = {}
+        for index, value in enumerate(file_data):
+            first_indices.setdefault(value, index)
+        locators.append((log_file_name, first_indices, timestamps))
+    return locators
+
+def format_value_locations(locators: List[Tuple[str, Dict[Any, int], List[float]]], value: Union[int, float]) -> List[str]:
+    """Return lines with the timestamp of the first occurrence of a value in each file that contains it."""
+    lines = []
+    for log_file_name, first_indices, timestamps in locators:
+        log_file_descriptor = f"in {log_file_name}" if len(locators) > 1 else ""
+        index = first_indices.get(value)
+        if index is not None:
+            lines.append(f"    @ {timestamps[index]:.6f} s {log_file_descriptor}")
+    return lines
+
+def mean_and_stdev(values: List[Union[int, float]]) -> Tuple[float, float]:
+    """Return the mean and sample standard deviation of at least two numeric values.
+    
+    The sums are exactly rounded with math.fsum instead of using the exact
+    fraction arithmetic of the statistics module, which is much slower.
+    """
+    count = len(values)
+    mean = math.fsum(values) / count
+    deviations = [x - mean for x in values]
+    # Subtracting the rounding error in the mean keeps the two-pass variance accurate
+    error = math.fsum(deviations)
+    variance = (math.fsum([d * d for d in deviations]) - error * error / count) / (count - 1)
+    return mean, math.sqrt(max(variance, 0.0))
+
+def format_outliers(results: List[Tuple[str, List[Union[int, float, str, bool]], List[float]]], mean: float, stddev: float,
+                    calc_name: str, value_unit: str, use_abs: bool = False) -> List[str]:
+    """Return lines for each numeric value more than two standard deviations from the mean, with the file and timestamp it came from.
+    
+    Args:
+        results: List of tuples containing log file name, data, and timestamps
+        mean: Mean of the numeric values
+        stddev: Standard deviation of the numeric values
+        calc_name: Name of the calculation to print with each outlier
+        value_unit: Unit for values
+        use_abs: Whether to check the absolute values instead
+        
+    Returns:
+        List of output lines, two for each outlier
+    """
+    lines = []
+    limit = 2 * stddev
+    for log_file_name, file_data, timestamps in results:
+        log_file_descriptor = f"in {log_file_name}" if len(results) > 1 else ""
+        for value, timestamp in zip(file_data, timestamps):
+            if not isinstance(value, (int, float)):
+                continue
+            if use_abs:
+                value = abs(value)
+            if abs(value - mean) > limit:
+                lines.append(f"  {calc_name}: {value:.6f} {value_unit}")
+                lines.append(f"    @ {timestamp:.6f} s {log_file_descriptor}")
+    return lines
 
 def print_results_and_calculations(results: List[Tuple[str, List[Union[int, float, str, bool]], List[float]]], calculations: List[Dict[str, Any]], 
-                                 value_unit: str = "") -> None:
+                                 value_unit: str = "", out: Optional[List[str]] = None) -> None:
     """Print results and perform calculations on time differences or captured values.
     
     Args:
         results: List of tuples containing log file name, data (time differences or values), and timestamps
         calculations: List of calculation configs from analysis config
         value_unit: Unit for values (e.g., "s" for time differences, "m" for meters)
+        out: List to add the output lines to, or None to write them all at once at the end
     """
+    if not calculations:
+        return
+
+    write_output = out is None
+    if write_output:
+        out = []
+
     # aggregate all data
     all_data = []
     for _, file_data, _ in results:
@@ -32,116 +132,127 @@ def print_results_and_calculations(results: List[Tuple[str, List[Union[int, floa
 
     if all_data:
         if len(results) == 1:
-            print(f"  Total values captured in this file: {len(all_data)}")
+            out.append(f"  Total values captured in this file: {len(all_data)}")
             if VERBOSE:
-                print(f"  Values captured: {[f'{v:.6f} {value_unit}' for v in all_data]}")
+                out.append(f"  Values captured: {[f'{v:.6f} {value_unit}' for v in all_data]}")
         else:
-            print(f"  Total values captured across all files: {len(all_data)}")
+            out.append(f"  Total values captured across all files: {len(all_data)}")
             if VERBOSE:
-                print(f"  All values: {[f'{v:.6f} {value_unit}' for v in all_data]}")
-
-        # Filter numeric values for calculations
-        numeric_values = []
-        abs_numeric_values = []
-        for val in all_data:
-            if isinstance(val, (int, float)):
-                numeric_values.append(val)
-                abs_numeric_values.append(abs(val))
+                out.append(f"  All values: {[f'{v:.6f} {value_unit}' for v in all_data]}")
+
+        # Filter numeric values for calculations. The absolute values are
+        # mapped in C rather than appended one by one, and only if an
+        # absolute calculation needs them.
+        numeric_values = [val for val in all_data if isinstance(val, (int, float))]
+        if any(str(calc.get('type')).startswith('abs_') for calc in calculations):
+            abs_numeric_values = list(map(abs, numeric_values))
+        else:
+            abs_numeric_values = []
 
         if numeric_values:
+            # Locators for finding the file and timestamp of a result, built
+            # the first time a calculation needs them
+            locators = None
+            abs_locators = None
+            
+            # Statistics shared by several calculations, computed once on first use
+            stats: Dict[str, float] = {}
+            
             # Perform calculations
             for calc in calculations:
                 calc_type = calc.get('type')
                 calc_name = calc.get('name', f'{calc_type} calculation')
                 
                 if calc_type == 'average':
-                    result = sum(numeric_values) / len(numeric_values)
-                    print(f"  {calc_name}: {result:.6f} {value_unit}")
+                    if 'average' not in stats:
+                        stats['average'] = sum(numeric_values) / len(numeric_values)
+                    result = stats['average']
+                    out.append(f"  {calc_name}: {result:.6f} {value_unit}")
                 elif calc_type == 'max':
-                    result = max(numeric_values)
-                    print(f"  {calc_name}: {result:.6f} {value_unit}")
+                    if 'max' not in stats:
+                        stats['max'] = max(numeric_values)
+                    result = stats['max']
+                    out.append(f"  {calc_name}: {result:.6f} {value_unit}")
                     # Find the log file name and timestamp corresponding to the max value
-                    for log_file_name, file_data, timestamps in results:
-                        log_file_descriptor = f"in {log_file_name}" if len(results) > 1 else ""
-                        if result in file_data:
-                            max_index = file_data.index(result)
-                            print(f"    @ {timestamps[max_index]:.6f} s {log_file_descriptor}")
+                    if locators is None:
+                        locators = build_value_locators(results)
+                    out.extend(format_value_locations(locators, result))
                 elif calc_type == 'min':
-                    result = min(numeric_values)
-                    print(f"  {calc_name}: {result:.6f} {value_unit}")
+                    if 'min' not in stats:
+                        stats['min'] = min(numeric_values)
+                    result = stats['min']
+                    out.append(f"  {calc_name}: {result:.6f} {value_unit}")
                     # Find the log file name and timestamp corresponding to the min value
-                    for log_file_name, file_data, timestamps in results:
-                        log_file_descriptor = f"in {log_file_name}" if len(results) > 1 else ""
-                        if result in file_data:
-                            min_index = file_data.index(result)
-                            print(f"    @ {timestamps[min_index]:.6f} s {log_file_descriptor}")
+                    if locators is None:
+                        locators = build_value_locators(results)
+                    out.extend(format_value_locations(locators, result))
                 elif calc_type == 'abs_average':
-                    result = sum(abs_numeric_values) / len(abs_numeric_values)
-                    print(f"  {calc_name}: {result:.6f} {value_unit}")
+                    if 'abs_average' not in stats:
+                        stats['abs_average'] = sum(abs_numeric_values) / len(abs_numeric_values)
+                    result = stats['abs_average']
+                    out.append(f"  {calc_name}: {result:.6f} {value_unit}")
                 elif calc_type == 'abs_max':
-                    result = max(abs_numeric_values)
-                    print(f"  {calc_name}: {result:.6f} {value_unit}")
+                    if 'abs_max' not in stats:
+                        stats['abs_max'] = max(abs_numeric_values)
+                    result = stats['abs_max']
+                    out.append(f"  {calc_name}: {result:.6f} {value_unit}")
                     # Find the log file name and timestamp corresponding to the max absolute value
-                    for log_file_name, file_data, timestamps in results:
-                        log_file_descriptor = f"in {log_file_name}" if len(results) > 1 else ""
-                        abs_file_data = [abs(x) for x in file_data if isinstance(x, (int, float))]
-                        if result in abs_file_data:
-                            max_index = abs_file_data.index(result)
-                            print(f"    @ {timestamps[max_index]:.6f} s {log_file_descriptor}")
+                    if abs_locators is None:
+                        abs_locators = build_value_locators(results, use_abs=True)
+                    out.extend(format_value_locations(abs_locators, result))
                 elif calc_type == 'abs_min':
-                    result = min(abs_numeric_values)
-                    print(f"  {calc_name}: {result:.6f} {value_unit}")
+                    if 'abs_min' not in stats:
+                        stats['abs_min'] = min(abs_numeric_values)
+                    result = stats['abs_min']
+                    out.append(f"  {calc_name}: {result:.6f} {value_unit}")
                     # Find the log file name and timestamp corresponding to the min absolute value
-                    for log_file_name, file_data, timestamps in results:
-                        log_file_descriptor = f"in {log_file_name}" if len(results) > 1 else ""
-                        abs_file_data = [abs(x) for x in file_data if isinstance(x, (int, float))]
-                        if result in abs_file_data:
-                            min_index = abs_file_data.index(result)
-                            print(f"    @ {timestamps[min_index]:.6f} s {log_file_descriptor}")
+                    if abs_locators is None:
+                        abs_locators = build_value_locators(results, use_abs=True)
+                    out.extend(format_value_locations(abs_locators, result))
                 elif calc_type == 'count':
                     result = len(numeric_values)
-                    print(f"  {calc_name}: {result}")
+                    out.append(f"  {calc_name}: {result}")
                 elif calc_type == 'outlier_2std':
                     if len(numeric_values) < 2:
-                        print(f"  {calc_name}: Cannot calculate with less than 2 values")
+                        out.append(f"  {calc_name}: Cannot calculate with less than 2 values")
                     else:
-                        mean = statistics.mean(numeric_values)
-                        stddev = statistics.stdev(numeric_values)
-                        outliers = [x for x in numeric_values if abs(x - mean) > 2 * stddev]
-                        # print each outlier and its associated timestamp
-                        for outlier in outliers:
-                            print(f"  {calc_name}: {outlier:.6f} {value_unit}")
-                            # Find the log file name and timestamp corresponding to the outlier value
-                            for log_file_name, file_data, timestamps in results:
-                                log_file_descriptor = f"in {log_file_name}" if len(results) > 1 else ""
-                                if outlier in file_data:
-                                    outlier_index = file_data.index(outlier)
-                                    print(f"    @ {timestamps[outlier_index]:.6f} s {log_file_descriptor}")
+                        if 'max' not in stats:
+                            stats['max'] = max(numeric_values)
+                        if 'min' not in stats:
+                            stats['min'] = min(numeric_values)
+                        # All values are equal to the mean when there is no spread
+                        if stats['max'] == stats['min']:
+                            continue
+                        if 'mean' not in stats:
+                            stats['mean'], stats['stddev'] = mean_and_stdev(numeric_values)
+                        # list each outlier and its associated timestamp
+                        out.extend(format_outliers(results, stats['mean'], stats['stddev'], calc_name, value_unit))
                 elif calc_type == 'abs_outlier_2std':
                     if len(abs_numeric_values) < 2:
-                        print(f"  {calc_name}: Cannot calculate with less than 2 values")
+                        out.append(f"  {calc_name}: Cannot calculate with less than 2 values")
                     else:
-                        mean = statistics.mean(abs_numeric_values)
-                        stddev = statistics.stdev(abs_numeric_values)
-                        outliers = [x for x in abs_numeric_values if abs(x - mean) > 2 * stddev]
-                        # print each outlier and its associated timestamp
-                        for outlier in outliers:
-                            print(f"  {calc_name}: {outlier:.6f} {value_unit}")
-                            # Find the log file name and timestamp corresponding to the outlier value
-                            for log_file_name, file_data, timestamps in results:
-                                log_file_descriptor = f"in {log_file_name}" if len(results) > 1 else ""
-                                abs_file_data = [abs(x) for x in file_data if isinstance(x, (int, float))]
-                                if outlier in abs_file_data:
-                                    outlier_index = abs_file_data.index(outlier)
-                                    print(f"    @ {timestamps[outlier_index]:.6f} s {log_file_descriptor}")
+                        if 'abs_max' not in stats:
+                            stats['abs_max'] = max(abs_numeric_values)
+                        if 'abs_min' not in stats:
+                            stats['abs_min'] = min(abs_numeric_values)
+                        # All values are equal to the mean when there is no spread
+                        if stats['abs_max'] == stats['abs_min']:
+                            continue
+                        if 'abs_mean' not in stats:
+                            stats['abs_mean'], stats['abs_stddev'] = mean_and_stdev(abs_numeric_values)
+                        # list each outlier and its associated timestamp
+                        out.extend(format_outliers(results, stats['abs_mean'], stats['abs_stddev'], calc_name, value_unit, use_abs=True))
                 else:
-                    print(f"  Unknown calculation type: {calc_type}")
+                    out.append(f"  Unknown calculation type: {calc_type}")
         else:
-            print(f"  No numeric values found for calculations")
+            out.append(f"  No numeric values found for calculations")
     else:
-        print(f"No values found for this analysis")
+        out.append(f"No values found for this analysis")
+
+    if write_output:
+        sys.stdout.write("\n".join(out) + "\n")
 
-def analyze_file_records(log: Log, log_file_name: str, time_analysis_configs: List[Dict[str, Any]]) -> Dict[int, Tuple[str, List[float], List[float]]]:
+def analyze_file_records(log: Log, log_file_name: str, time_analysis_configs: List[Dict[str, Any]]) -> Dict[int, Tuple[str, Sequence[float], Sequence[float]]]:
     """
     Analyze file records and return time differences and start timestamps for each analysis configuration.
     
@@ -166,8 +277,10 @@ def analyze_file_records(log: Log, log_file_name: str, time_analysis_configs: Li
             continue
         
         # Find time differences between start and end events
-        time_differences = []
-        start_timestamps = []
+        # Floats are stored unboxed, which also keeps them compact to send
+        # back from the worker processes
+        time_differences = array.array('d')
+        start_timestamps = array.array('d')
 
         # Get the field and timestamps for the start entry
         start_field = log.get_field(start_entry)
@@ -178,51 +291,46 @@ def analyze_file_records(log: Log, log_file_name: str, time_analysis_configs: Li
             all_analysis_results[analysis_idx] = ("", [], [])
             continue
 
-        if start_field.get_type() == LoggableType.STRING:
-            start_log_values = start_field.get_string(0.0, log.get_last_timestamp())
-        elif start_field.get_type() == LoggableType.BOOLEAN:
-            start_log_values = start_field.get_boolean(0.0, log.get_last_timestamp())
-        elif start_field.get_type() == LoggableType.NUMBER:
-            start_log_values = start_field.get_number(0.0, log.get_last_timestamp())
-        else:
+        get_start_values = get_values_getter(start_field)
+        if get_start_values is None:
             print(f"  Skipping analysis {analysis_idx} due to unsupported type for: {start_entry} of {start_field.get_type()}")
             all_analysis_results[analysis_idx] = ("", [], [])
             continue
+        last_timestamp = log.get_last_timestamp()
+        start_log_values = get_start_values(0.0, last_timestamp)
+        get_end_values = get_values_getter(end_field)
             
-        start_timestamp = 0.0
-
-        for i, timestamp in enumerate(start_log_values.timestamps):
-            if start_log_values.values[i] == start_value:
-                start_timestamp = timestamp
-                next_timestamp = log.get_last_timestamp()
-                for j, next_ts in enumerate(start_log_values.timestamps):
-                    if next_ts > start_timestamp and start_log_values.values[j] == start_value:
-                        next_timestamp = next_ts
-                        break
-
-                if end_field.get_type() == LoggableType.STRING:
-                    end_log_values = end_field.get_string(start_timestamp, next_timestamp)
-                elif end_field.get_type() == LoggableType.BOOLEAN:
-                    end_log_values = end_field.get_boolean(start_timestamp, next_timestamp)
-                elif end_field.get_type() == LoggableType.NUMBER:
-                    end_log_values = end_field.get_number(start_timestamp, next_timestamp)
-                else:
-                    print(f"  Skipping analysis {analysis_idx} due to unsupported type for: {end_entry} of {end_field.get_type()}")
-                    all_analysis_results[analysis_idx] = ("", [], [])
-                    continue
-
-                for k, end_timestamp in enumerate(end_log_values.timestamps):
-                    if end_log_values.values[k] == end_value:
-                        time_diff = end_timestamp - start_timestamp
-                        time_differences.append(time_diff)
-                        start_timestamps.append(start_timestamp)
-                        break
+        # Timestamps of the start events, each paired with the timestamp of the
+        # next later start event (or the end of the log). The timestamps are
+        # sorted, so one backwards pass finds every next start.
+        match_timestamps = [timestamp for timestamp, value in zip(start_log_values.timestamps, start_log_values.values)
+                            if value == start_value]
+        next_timestamps = [0.0] * len(match_timestamps)
+        following_timestamp = last_timestamp
+        for i in range(len(match_timestamps) - 1, -1, -1):
+            next_timestamps[i] = following_timestamp
+            if i == 0 or match_timestamps[i - 1] < match_timestamps[i]:
+                following_timestamp = match_timestamps[i]
+
+        for start_timestamp, next_timestamp in zip(match_timestamps, next_timestamps):
+            if get_end_values is None:
+                print(f"  Skipping analysis {analysis_idx} due to unsupported type for: {end_entry} of {end_field.get_type()}")
+                all_analysis_results[analysis_idx] = ("", [], [])
+                continue
+            end_log_values = get_end_values(start_timestamp, next_timestamp)
+
+            for k, end_timestamp in enumerate(end_log_values.timestamps):
+                if end_log_values.values[k] == end_value:
+                    time_diff = end_timestamp - start_timestamp
+                    time_differences.append(time_diff)
+                    start_timestamps.append(start_timestamp)
+                    break
         
         all_analysis_results[analysis_idx] = (log_file_name, time_differences, start_timestamps)
     
     return all_analysis_results
 
-def analyze_value_records(log: Log, log_file_name: str, value_analysis_configs: List[Dict[str, Any]]) -> Dict[int, Tuple[str, List[Union[int, float, str, bool]], List[float]]]:
+def analyze_value_records(log: Log, log_file_name: str, value_analysis_configs: List[Dict[str, Any]]) -> Dict[int, Tuple[str, List[Union[int, float, str, bool]], Sequence[float]]]:
     """
     Analyze file records and return captured values and timestamps for each value analysis configuration.
     
@@ -245,9 +353,10 @@ def analyze_value_records(log: Log, log_file_name: str, value_analysis_configs:
             all_value_results[analysis_idx] = ("", [], [])
             continue
         
-        # Find values when trigger condition is met
+        # Find values when trigger condition is met. Values are always
+        # captured into a list so every field type gives the same result type
         captured_values = []
-        end_timestamps = []
+        end_timestamps = array.array('d')
 
         # Get the field and timestamps for the start entry
         trigger_field = log.get_field(trigger_entry)
@@ -258,16 +367,13 @@ def analyze_value_records(log: Log, log_file_name: str, value_analysis_configs:
             all_value_results[analysis_idx] = ("", [], [])
             continue
 
-        if trigger_field.get_type() == LoggableType.STRING:
-            trigger_log_values = trigger_field.get_string(0.0, log.get_last_timestamp())
-        elif trigger_field.get_type() == LoggableType.BOOLEAN:
-            trigger_log_values = trigger_field.get_boolean(0.0, log.get_last_timestamp())
-        elif trigger_field.get_type() == LoggableType.NUMBER:
-            trigger_log_values = trigger_field.get_number(0.0, log.get_last_timestamp())
-        else:
+        get_trigger_values = get_values_getter(trigger_field)
+        if get_trigger_values is None:
             print(f"  Skipping analysis {analysis_idx} due to unsupported type for: {trigger_entry} of {trigger_field.get_type()}")
             all_value_results[analysis_idx] = ("", [], [])
             continue
+        trigger_log_values = get_trigger_values(0.0, log.get_last_timestamp())
+        get_field_values = get_values_getter(field)
             
         start_timestamp = 0.0
 
@@ -275,19 +381,16 @@ def analyze_value_records(log: Log, log_file_name: str, value_analysis_configs:
             if trigger_log_values.values[i] == trigger_value:
                 end_timestamp = timestamp
                 
-                if field.get_type() == LoggableType.STRING:
-                    log_values = field.get_string(start_timestamp, end_timestamp)
-                elif field.get_type() == LoggableType.BOOLEAN:
-                    log_values = field.get_boolean(start_timestamp, end_timestamp)
-                elif field.get_type() == LoggableType.NUMBER:
-                    log_values = field.get_number(start_timestamp, end_timestamp)
-                else:
+                if get_field_values is None:
                     print(f"  Skipping analysis {analysis_idx} due to unsupported type for: {entry_name} of {field.get_type()}")
                     all_value_results[analysis_idx] = ("", [], [])
                     continue
+                # Only the last value before each trigger is captured, so it is read
+                # by index instead of slicing out every value in the range
+                start_index, end_index = field.get_range_indices(start_timestamp, end_timestamp)
 
-                if len(log_values.values) > 0:
-                    captured_values.append(log_values.values[-1])
+                if end_index > start_index:
+                    captured_values.extend(field.get_values_by_index(end_index - 1, end_index))
                     end_timestamps.append(end_timestamp)
                 start_timestamp = timestamp  # Update start timestamp for next trigger match
         
@@ -337,31 +440,68 @@ def process_log_file(log_file_path: str, mandatory_entries: Set[str], target_ent
         return True
 
 
-    print(f"\nProcessing: {os.path.basename(log_file_path)}")
+    log_file_name = os.path.basename(log_file_path)
+    print(f"\nProcessing: {log_file_name}")
     
     with open(log_file_path, "rb") as f:
         mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # The log is read front to back once, so let the kernel read ahead
+        # (madvise is not available on Windows)
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
         reader = DataLogReader(mm)
         if not reader:
-            print(f"  Warning: {os.path.basename(log_file_path)} is not a valid log file")
+            print(f"  Warning: {log_file_name} is not a valid log file")
             return Log()
 
         entries = {}
         log = Log()
         
+        # Record getter and log putter for each entry type that is written directly
+        record_putters = {
+            "boolean": (DataLogRecord.getBoolean, log.put_boolean),
+            "int": (DataLogRecord.getInteger, log.put_number),
+            "int64": (DataLogRecord.getInteger, log.put_number),
+            "float": (DataLogRecord.getFloat, log.put_number),
+            "double": (DataLogRecord.getDouble, log.put_number),
+            "string": (DataLogRecord.getString, log.put_string),
+            "boolean[]": (DataLogRecord.getBooleanArray, log.put_boolean_array),
+            "int[]": (DataLogRecord.getIntegerArray, log.put_number_array),
+            "int64[]": (DataLogRecord.getIntegerArray, log.put_number_array),
+            "float[]": (DataLogRecord.getFloatArray, log.put_number_array),
+            "double[]": (DataLogRecord.getDoubleArray, log.put_number_array),
+            "string[]": (DataLogRecord.getStringArray, log.put_string_array),
+            "json": (DataLogRecord.getString, log.put_json),
+            "msgpack": (operator.attrgetter("data"), log.put_msgpack),  # getRaw() equivalent
+        }
+        
+        # Whether each entry name is part of any mandatory or target entry
+        # name, checked once per name instead of once per record. Substrings
+        # match so that struct parents of target fields are captured.
+        name_matches: Dict[str, Tuple[bool, bool]] = {}
+        
+        # Schema entry names whose schema has already been added
+        schemas_seen: Set[str] = set()
+        
         # Track most recent values of DriverStation entries for filtering
         driver_station_enabled = None
         driver_station_autonomous = None
         driver_station_fms_attached = None
         
+        # Result of the filters for the current DriverStation state, only
+        # re-checked when that state changes
+        filters_passed = should_capture_record(driver_station_enabled, driver_station_autonomous, driver_station_fms_attached)
+        
         for record in reader:
-            timestamp = record.timestamp / 1000000
             if record.isStart():
                 try:
                     data = record.getStartData()
                     if data.entry in entries:
                         print("...DUPLICATE entry ID, overriding")
 
+                    # The name is used as the field key for every record of
+                    # the entry, so intern it once here
+                    data.name = sys.intern(data.name)
                     entries[data.entry] = data
                     
                 except TypeError:
@@ -390,51 +530,47 @@ def process_log_file(log_file_path: str, mandatory_entries: Set[str], target_ent
                 if entry is None:
                     continue
 
-                # Update DriverStation state tracking for filtering
-                try:
-                    if entry.name == "/DriverStation/Enabled" and entry.type == "boolean":
-                        driver_station_enabled = record.getBoolean()
-                    elif entry.name == "/DriverStation/Autonomous" and entry.type == "boolean":
-                        driver_station_autonomous = record.getBoolean()
-                    elif entry.name == "/DriverStation/FMSAttached" and entry.type == "boolean":
-                        driver_station_fms_attached = record.getBoolean()
-                except TypeError:
-                    # If we can't read the value, continue without updating state
-                    pass
-
-                if ".schema" in entry.name:
-                    # If the entry is a schema entry, we may want to capture it differently
-                    log.struct_decoder.add_schema(entry.name.split("struct:")[1], record.getBytes())
+                # Update DriverStation state tracking for filtering. Most records
+                # aren't DriverStation booleans, so check that once up front.
+                if entry.type == "boolean" and entry.name.startswith("/DriverStation/"):
+                    try:
+                        if entry.name == "/DriverStation/Enabled":
+                            driver_station_enabled = record.getBoolean()
+                            filters_passed = should_capture_record(driver_station_enabled, driver_station_autonomous, driver_station_fms_attached)
+                        elif entry.name == "/DriverStation/Autonomous":
+                            driver_station_autonomous = record.getBoolean()
+                            filters_passed = should_capture_record(driver_station_enabled, driver_station_autonomous, driver_station_fms_attached)
+                        elif entry.name == "/DriverStation/FMSAttached":
+                            driver_station_fms_attached = record.getBoolean()
+                            filters_passed = should_capture_record(driver_station_enabled, driver_station_autonomous, driver_station_fms_attached)
+                    except TypeError:
+                        # If we can't read the value, continue without updating state
+                        pass
+
+                if ".schema" in entry.name and entry.name not in schemas_seen:
+                    # If the entry is a schema entry, we may want to capture it
+                    # differently. Schemas don't change, so only the first record
+                    # of each is used, and only struct schemas can be decoded.
+                    schemas_seen.add(entry.name)
+                    if STRUCT_PREFIX in entry.name:
+                        log.struct_decoder.add_schema(entry.name.split(STRUCT_PREFIX)[1], record.getBytes())
                 
                 # Check if this record matches any target entry names and meets filtering criteria
-                if any(entry.name in name for name in mandatory_entries) or (any(entry.name in name for name in target_entry_names)and should_capture_record(driver_station_enabled, driver_station_autonomous, driver_station_fms_attached)):
+                matches = name_matches.get(entry.name)
+                if matches is None:
+                    matches = name_matches[entry.name] = (any(entry.name in name for name in mandatory_entries),
+                                                          any(entry.name in name for name in target_entry_names))
+                is_mandatory, is_target = matches
+                if is_mandatory or (is_target and filters_passed):
+                    # Only captured records need their timestamp in seconds
+                    timestamp = record.timestamp / 1000000
                     key = entry.name
                     type_str = entry.type
                     
-                    if type_str == "boolean":
-                        log.put_boolean(key, timestamp, record.getBoolean())
-                    elif type_str in ("int", "int64"):
-                        log.put_number(key, timestamp, record.getInteger())
-                    elif type_str == "float":
-                        log.put_number(key, timestamp, record.getFloat())
-                    elif type_str == "double":
-                        log.put_number(key, timestamp, record.getDouble())
-                    elif type_str == "string":
-                        log.put_string(key, timestamp, record.getString())
-                    elif type_str == "boolean[]":
-                        log.put_boolean_array(key, timestamp, record.getBooleanArray())
-                    elif type_str in ("int[]", "int64[]"):
-                        log.put_number_array(key, timestamp, record.getIntegerArray())
-                    elif type_str == "float[]":
-                        log.put_number_array(key, timestamp, record.getFloatArray())
-                    elif type_str == "double[]":
-                        log.put_number_array(key, timestamp, record.getDoubleArray())
-                    elif type_str == "string[]":
-                        log.put_string_array(key, timestamp, record.getStringArray())
-                    elif type_str == "json":
-                        log.put_json(key, timestamp, record.getString())
-                    elif type_str == "msgpack":
-                        log.put_msgpack(key, timestamp, record.data)  # getRaw() equivalent
+                    record_putter = record_putters.get(type_str)
+                    if record_putter is not None:
+                        getter, putter = record_putter
+                        putter(key, timestamp, getter(record))
                     else:  # Default to raw
                         if type_str.startswith(STRUCT_PREFIX):
                             schema_type = type_str.split(STRUCT_PREFIX)[1]
@@ -448,6 +584,40 @@ def process_log_file(log_file_path: str, mandatory_entries: Set[str], target_ent
                     
         return log
 
+def analyze_log_file(log_file_path: str, mandatory_entries: Set[str], target_entry_names: Set[str],
+                     filter_enabled: bool, filter_fms_attached: bool, robot_mode: str,
+                     time_analysis_configs: List[Dict[str, Any]], value_analysis_configs: List[Dict[str, Any]]
+                     ) -> Tuple[str, Dict[int, Tuple[str, Sequence[float], Sequence[float]]],
+                                Dict[int, Tuple[str, List[Union[int, float, str, bool]], Sequence[float]]], Dict[str, int]]:
+    """
+    Process and analyze a single log file, so that files can be handled in separate worker processes.
+    Args:
+        log_file_path: Path to the log file to process
+        mandatory_entries: Set of mandatory entry names to always capture
+        target_entry_names: Set of target entry names to capture based on filtering configuration
+        filter_enabled: Whether to filter records based on driver station enabled state
+        filter_fms_attached: Whether to filter records based on FMS attached state
+        robot_mode: Robot mode filter ('auto', 'teleop', or 'both')
+        time_analysis_configs: List of time analysis configuration dictionaries
+        value_analysis_configs: List of value analysis configuration dictionaries
+    Returns: Tuple of (printed output, time analysis results, value analysis results, record counts by entry name)
+        The output is captured rather than printed so files processed in parallel can be reported in order.
+        Record counts are only collected in verbose mode.
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        log = process_log_file(log_file_path, mandatory_entries, target_entry_names,
+                               filter_enabled, filter_fms_attached, robot_mode)
+        log_file_name = os.path.basename(log_file_path)
+        time_analysis_results = analyze_file_records(log, log_file_name, time_analysis_configs) if time_analysis_configs else {}
+        value_analysis_results = analyze_value_records(log, log_file_name, value_analysis_configs) if value_analysis_configs else {}
+    
+    entry_counts = {}
+    if VERBOSE:
+        for key in log.get_field_keys():
+            entry_counts[key] = log.get_field(key).timestamp_count
+    return output.getvalue(), time_analysis_results, value_analysis_results, entry_counts
+
 def main() -> None:
     """Main analysis function."""
     if len(sys.argv) != 3:
@@ -511,208 +681,258 @@ def main() -> None:
         print(f"No log files found in {log_folder}", file=sys.stderr)
         sys.exit(1)
     
-     # Print filtering criteria and final states
-    print(f"\n=== FILTERING CRITERIA ===")
-    print(f"Filter for enabled: {filter_on_enabled}")
-    print(f"Filter for FMS attached: {filter_on_fms_attached}")
-    print(f"Filter for robot mode: {filter_on_robot_mode}")
+    # Output lines, written once per section
+    out: List[str] = []
+    emit = out.append
 
-    print(f"\n=== ANALYSIS ===")
-    print(f"Found {len(log_files)} log files to process:")
-    for log_file in sorted(log_files):
-        print(f"  {os.path.basename(log_file)}")
+    def flush_output() -> None:
+        if out:
+            sys.stdout.write("\n".join(out) + "\n")
+            out.clear()
+
+     # Print filtering criteria and final states
+    emit(f"\n=== FILTERING CRITERIA ===")
+    emit(f"Filter for enabled: {filter_on_enabled}")
+    emit(f"Filter for FMS attached: {filter_on_fms_attached}")
+    emit(f"Filter for robot mode: {filter_on_robot_mode}")
+
+    emit(f"\n=== ANALYSIS ===")
+    # Sort the files and find their names once
+    log_files = sorted(log_files)
+    log_file_names = [os.path.basename(log_file) for log_file in log_files]
+    emit(f"Found {len(log_files)} log files to process:")
+    for log_file_name in log_file_names:
+        emit(f"  {log_file_name}")
+    flush_output()
+
+    # Read and validate each analysis configuration once rather than for
+    # every file. Incomplete configurations are None.
+    resolved_time_analyses = []
+    for analysis in time_analysis_configs:
+        start_entry = analysis.get('startEntry')
+        end_entry = analysis.get('endEntry')
+        calculations = analysis.get('calculations', [])
+        if not all([start_entry, end_entry, calculations]):
+            resolved_time_analyses.append(None)
+        else:
+            resolved_time_analyses.append((start_entry, analysis.get('startValue'), end_entry,
+                                           analysis.get('endValue'), calculations))
+    
+    resolved_value_analyses = []
+    for analysis in value_analysis_configs:
+        entry_name = analysis.get('entry')
+        trigger_entry = analysis.get('triggerEntry')
+        trigger_value = analysis.get('triggerValue')
+        calculations = analysis.get('calculations', [])
+        if not all([entry_name, trigger_entry, calculations]) or trigger_value is None:
+            resolved_value_analyses.append(None)
+        else:
+            resolved_value_analyses.append((entry_name, analysis.get('entryUnit', ""), trigger_entry,
+                                            trigger_value, calculations))
 
     # Aggregated data across all files
-    all_logs = []  # List to store records from all files
-    aggregated_time_analysis_results = {}  # Dictionary to store aggregated times by analysis index
-    aggregated_value_analysis_results = {}  # Dictionary to store aggregated values by analysis index
+    all_entry_counts = []  # List to store record counts by entry name from all files
+    aggregated_time_analysis_results = [[] for _ in time_analysis_configs]  # List of aggregated times for each analysis index
+    aggregated_value_analysis_results = [[] for _ in value_analysis_configs]  # List of aggregated values for each analysis index
 
-    # Process all log files
-    for log_file in sorted(log_files):
-        log = process_log_file(log_file, mandatory_entries, target_entry_names, 
-                               filter_on_enabled, filter_on_fms_attached, filter_on_robot_mode)
-        all_logs.append(log)
+    analysis_args = (mandatory_entries, target_entry_names, filter_on_enabled, filter_on_fms_attached,
+                     filter_on_robot_mode, time_analysis_configs, value_analysis_configs)
+    max_workers = min(len(log_files), os.cpu_count() or 1)
 
-        # Analyze time records and aggregate for later cross-file analysis
-        if time_analysis_configs:
-            time_analysis_results = analyze_file_records(log, os.path.basename(log_file), time_analysis_configs)
+    def analyzed_log_files():
+        """
+        Yield each file name with its analysis in order, as soon as it is ready.
+        Files are analyzed in a process pool unless there is only one file or worker.
+        The analysis is None if the file couldn't be analyzed.
+        """
+        if max_workers <= 1:
+            for log_file, file_name in zip(log_files, log_file_names):
+                try:
+                    file_result = analyze_log_file(log_file, *analysis_args)
+                except Exception as e:
+                    print(f"Error processing {file_name}: {e}", file=sys.stderr)
+                    file_result = None
+                yield file_name, file_result
+            return
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(analyze_log_file, log_file, *analysis_args) for log_file in log_files]
+            for file_name, future in zip(log_file_names, futures):
+                try:
+                    file_result = future.result()
+                except Exception as e:
+                    print(f"Error processing {file_name}: {e}", file=sys.stderr)
+                    file_result = None
+                yield file_name, file_result
+
+    # Process and analyze all log files, reporting each in order once it is done
+    for file_name, file_result in analyzed_log_files():
+        if file_result is None:
+            continue
+        output, time_analysis_results, value_analysis_results, entry_counts = file_result
+        sys.stdout.write(output)
+        all_entry_counts.append(entry_counts)
 
+        # Aggregate time records for later cross-file analysis
+        if time_analysis_configs:
             # Aggregate results for later cross-file analysis (even empty results)
             for analysis_idx, (log_file_name, time_differences, timestamps) in time_analysis_results.items():
-                if analysis_idx not in aggregated_time_analysis_results:
-                    aggregated_time_analysis_results[analysis_idx] = []
                 aggregated_time_analysis_results[analysis_idx].append((log_file_name, time_differences, timestamps))
 
-        # Analyze value records and aggregate for later cross-file analysis  
+        # Aggregate value records for later cross-file analysis  
         if value_analysis_configs:
-            value_analysis_results = analyze_value_records(log, os.path.basename(log_file), value_analysis_configs)
-            
             # Aggregate results for later cross-file analysis (even empty results)
             for analysis_idx, (log_file_name, values, end_timestamps) in value_analysis_results.items():
-                if analysis_idx not in aggregated_value_analysis_results:
-                    aggregated_value_analysis_results[analysis_idx] = []
                 aggregated_value_analysis_results[analysis_idx].append((log_file_name, values, end_timestamps))
 
         # Perform cycle time analysis calculations on individual file data
         if time_analysis_configs:
-            print(f"\n=== TIME ANALYSIS RESULTS FOR {os.path.basename(log_file)} ===")
+            emit(f"\n=== TIME ANALYSIS RESULTS FOR {file_name} ===")
             
-            for analysis_idx, analysis in enumerate(time_analysis_configs):
-                start_entry = analysis.get('startEntry')
-                start_value = analysis.get('startValue')
-                end_entry = analysis.get('endEntry')
-                end_value = analysis.get('endValue')
-                calculations = analysis.get('calculations', [])
-                
-                if not all([start_entry, end_entry, calculations]):
-                    print(f"Skipping incomplete analysis configuration")
+            for analysis_idx, resolved_analysis in enumerate(resolved_time_analyses):
+                if resolved_analysis is None:
+                    emit(f"Skipping incomplete analysis configuration")
                     continue
+                start_entry, start_value, end_entry, end_value, calculations = resolved_analysis
                 
-                print(f"\nAnalyzing: {start_entry} ({start_value}) -> {end_entry} ({end_value})")
+                emit(f"\nAnalyzing: {start_entry} ({start_value}) -> {end_entry} ({end_value})")
 
                 results = time_analysis_results.get(analysis_idx, ("", [], []))
 
                 # Print found cycles and perform calculations for this file
-                print_results_and_calculations([results], calculations, value_unit="s")
+                print_results_and_calculations([results], calculations, value_unit="s", out=out)
 
         # Perform value analysis calculations on individual file data
         if value_analysis_configs:
-            print(f"\n=== VALUE ANALYSIS RESULTS FOR {os.path.basename(log_file)} ===")
+            emit(f"\n=== VALUE ANALYSIS RESULTS FOR {file_name} ===")
             
-            for analysis_idx, analysis in enumerate(value_analysis_configs):
-                entry_name = analysis.get('entry')
-                entry_unit = analysis.get('entryUnit', "")
-                trigger_entry = analysis.get('triggerEntry')
-                trigger_value = analysis.get('triggerValue')
-                calculations = analysis.get('calculations', [])
-                
-                if not all([entry_name, trigger_entry, calculations]) or trigger_value is None:
-                    print(f"Skipping incomplete value analysis configuration")
+            for analysis_idx, resolved_analysis in enumerate(resolved_value_analyses):
+                if resolved_analysis is None:
+                    emit(f"Skipping incomplete value analysis configuration")
                     continue
+                entry_name, entry_unit, trigger_entry, trigger_value, calculations = resolved_analysis
                 
-                print(f"\nAnalyzing: {entry_name} when {trigger_entry} = {trigger_value}")
+                emit(f"\nAnalyzing: {entry_name} when {trigger_entry} = {trigger_value}")
 
                 results = value_analysis_results.get(analysis_idx, ("", [], []))
 
                 # Print captured values and perform calculations for this file
-                print_results_and_calculations([results], calculations, value_unit=entry_unit)
+                print_results_and_calculations([results], calculations, value_unit=entry_unit, out=out)
+
+        flush_output()
 
     # Perform aggregated analysis across all files
-    if time_analysis_configs and aggregated_time_analysis_results:
-        print(f"\n=== AGGREGATED TIME ANALYSIS RESULTS ACROSS ALL FILES ===")
+    if time_analysis_configs:
+        emit(f"\n=== AGGREGATED TIME ANALYSIS RESULTS ACROSS ALL FILES ===")
         
-        for analysis_idx, analysis in enumerate(time_analysis_configs):
-            start_entry = analysis.get('startEntry')
-            start_value = analysis.get('startValue')
-            end_entry = analysis.get('endEntry')
-            end_value = analysis.get('endValue')
-            calculations = analysis.get('calculations', [])
-            
-            if not all([start_entry, end_entry, calculations]):
-                print(f"Skipping incomplete analysis configuration")
+        for analysis_idx, resolved_analysis in enumerate(resolved_time_analyses):
+            if resolved_analysis is None:
+                emit(f"Skipping incomplete analysis configuration")
                 continue
+            start_entry, start_value, end_entry, end_value, calculations = resolved_analysis
+            calc_types = {calc.get('type') for calc in calculations}
             
-            print(f"\nAggregated Analysis: {start_entry} ({start_value}) -> {end_entry} ({end_value})")
+            emit(f"\nAggregated Analysis: {start_entry} ({start_value}) -> {end_entry} ({end_value})")
             
-            all_results_by_file = aggregated_time_analysis_results.get(analysis_idx, [])
+            all_results_by_file = aggregated_time_analysis_results[analysis_idx]
             
             if all_results_by_file:
-                # Extract time differences for cycle statistics
-                all_time_differences_by_file = [time_diffs for _, time_diffs, _ in all_results_by_file]
-                
-                # Calculate per-file cycle statistics
-                cycle_counts = [len(file_diffs) for file_diffs in all_time_differences_by_file]
-                total_cycles = sum(cycle_counts)
+                # Calculate per-file cycle statistics in one pass, keeping the
+                # first file with the fewest and the most cycles
+                total_cycles = 0
+                min_cycles_per_file = max_cycles_per_file = len(all_results_by_file[0][1])
+                min_matched_values_file = max_matched_values_file = all_results_by_file[0][0]
+                for log_file_name, time_differences, _ in all_results_by_file:
+                    cycle_count = len(time_differences)
+                    total_cycles += cycle_count
+                    if cycle_count < min_cycles_per_file:
+                        min_cycles_per_file, min_matched_values_file = cycle_count, log_file_name
+                    if cycle_count > max_cycles_per_file:
+                        max_cycles_per_file, max_matched_values_file = cycle_count, log_file_name
                 
-                print(f"  Files processed: {len(all_time_differences_by_file)}")
+                emit(f"  Files processed: {len(all_results_by_file)}")
                 
-                if cycle_counts and "count" in [calc.get('type') for calc in calculations]:
-                    avg_cycles_per_file = total_cycles / len(cycle_counts)
-                    min_cycles_per_file = min(cycle_counts)
-                    max_cycles_per_file = max(cycle_counts)
+                if "count" in calc_types:
+                    avg_cycles_per_file = total_cycles / len(all_results_by_file)
 
-                    print(f"  Average matched values per file: {avg_cycles_per_file:.2f}")
-                    min_matched_values_file = all_results_by_file[cycle_counts.index(min_cycles_per_file)][0]
-                    print(f"  Minimum matched values in any file: {min_cycles_per_file} in {min_matched_values_file}")
-                    max_matched_values_file = all_results_by_file[cycle_counts.index(max_cycles_per_file)][0]
-                    print(f"  Maximum matched values in any file: {max_cycles_per_file} in {max_matched_values_file}")
+                    emit(f"  Average matched values per file: {avg_cycles_per_file:.2f}")
+                    emit(f"  Minimum matched values in any file: {min_cycles_per_file} in {min_matched_values_file}")
+                    emit(f"  Maximum matched values in any file: {max_cycles_per_file} in {max_matched_values_file}")
 
                 # Print aggregated cycles summary and perform calculations
-                print_results_and_calculations(all_results_by_file, calculations, value_unit="s")
+                print_results_and_calculations(all_results_by_file, calculations, value_unit="s", out=out)
             else:
-                print(f"  No complete cycles found for this analysis across all files")
+                emit(f"  No complete cycles found for this analysis across all files")
+        flush_output()
 
     # Perform aggregated value analysis across all files
-    if value_analysis_configs and aggregated_value_analysis_results:
-        print(f"\n=== AGGREGATED VALUE ANALYSIS RESULTS ACROSS ALL FILES ===")
+    if value_analysis_configs:
+        emit(f"\n=== AGGREGATED VALUE ANALYSIS RESULTS ACROSS ALL FILES ===")
         
-        for analysis_idx, analysis in enumerate(value_analysis_configs):
-            entry_name = analysis.get('entry')
-            entry_unit = analysis.get('entryUnit', "")
-            trigger_entry = analysis.get('triggerEntry')
-            trigger_value = analysis.get('triggerValue')
-            calculations = analysis.get('calculations', [])
-            
-            if not all([entry_name, trigger_entry, calculations]) or trigger_value is None:
-                print(f"Skipping incomplete value analysis configuration")
+        for analysis_idx, resolved_analysis in enumerate(resolved_value_analyses):
+            if resolved_analysis is None:
+                emit(f"Skipping incomplete value analysis configuration")
                 continue
+            entry_name, entry_unit, trigger_entry, trigger_value, calculations = resolved_analysis
+            calc_types = {calc.get('type') for calc in calculations}
             
-            print(f"\nAggregated Value Analysis: {entry_name} when {trigger_entry} = {trigger_value}")
+            emit(f"\nAggregated Value Analysis: {entry_name} when {trigger_entry} = {trigger_value}")
             
-            all_values_by_file = aggregated_value_analysis_results.get(analysis_idx, [])
+            all_values_by_file = aggregated_value_analysis_results[analysis_idx]
             
             if all_values_by_file:
-                # Extract values for statistics
-                all_values_lists = [values for _, values, _ in all_values_by_file]
-                
-                # Calculate per-file value statistics
-                value_counts = [len(file_values) for file_values in all_values_lists]
-                total_values = sum(value_counts)
+                # Calculate per-file value statistics in one pass, keeping the
+                # first file with the fewest and the most values
+                total_values = 0
+                min_values_per_file = max_values_per_file = len(all_values_by_file[0][1])
+                min_matched_values_file = max_matched_values_file = all_values_by_file[0][0]
+                for log_file_name, values, _ in all_values_by_file:
+                    value_count = len(values)
+                    total_values += value_count
+                    if value_count < min_values_per_file:
+                        min_values_per_file, min_matched_values_file = value_count, log_file_name
+                    if value_count > max_values_per_file:
+                        max_values_per_file, max_matched_values_file = value_count, log_file_name
                 
-                print(f"  Files processed: {len(all_values_lists)}")
+                emit(f"  Files processed: {len(all_values_by_file)}")
                 
-                if value_counts and "count" in [calc.get('type') for calc in calculations]:
-                    avg_values_per_file = total_values / len(value_counts)
-                    min_values_per_file = min(value_counts)
-                    max_values_per_file = max(value_counts)
+                if "count" in calc_types:
+                    avg_values_per_file = total_values / len(all_values_by_file)
                     
-                    print(f"  Average matched values per file: {avg_values_per_file:.2f}")
-                    min_matched_values_file = all_results_by_file[cycle_counts.index(min_cycles_per_file)][0]
-                    print(f"  Minimum matched values in any file: {min_values_per_file} in {min_matched_values_file}")
-                    max_matched_values_file = all_results_by_file[cycle_counts.index(max_cycles_per_file)][0]
-                    print(f"  Maximum matched values in any file: {max_values_per_file} in {max_matched_values_file}")
+                    emit(f"  Average matched values per file: {avg_values_per_file:.2f}")
+                    emit(f"  Minimum matched values in any file: {min_values_per_file} in {min_matched_values_file}")
+                    emit(f"  Maximum matched values in any file: {max_values_per_file} in {max_matched_values_file}")
 
-                print_results_and_calculations(all_values_by_file, calculations, value_unit=entry_unit)
+                print_results_and_calculations(all_values_by_file, calculations, value_unit=entry_unit, out=out)
                     
             else:
-                print(f"  No values captured for this analysis across all files")
+                emit(f"  No values captured for this analysis across all files")
+        flush_output()
 
     # Print summary of captured records
     if(VERBOSE):
-        print(f"\n=== CAPTURED RECORDS SUMMARY ===")
-        print(f"Total captured logs: {len(all_logs)}")
-        print(f"Target entry names: {sorted(target_entry_names)}")
-        print(f"Mandatory entries (always captured): {sorted(mandatory_entries)}")
+        emit(f"\n=== CAPTURED RECORDS SUMMARY ===")
+        emit(f"Total captured logs: {len(all_entry_counts)}")
+        emit(f"Target entry names: {sorted(target_entry_names)}")
+        emit(f"Mandatory entries (always captured): {sorted(mandatory_entries)}")
         config_only_entries = target_entry_names - mandatory_entries
         if config_only_entries:
-            print(f"Additional entries from JSON config: {sorted(config_only_entries)}")
+            emit(f"Additional entries from JSON config: {sorted(config_only_entries)}")
         else:
-            print("Additional entries from JSON config: None")
+            emit("Additional entries from JSON config: None")
     
     if(VERBOSE):
-        if all_logs:
-            print(f"\nCaptured logs by entry name:")
-            entry_counts = {}
-            for log in all_logs:
-                for key in log.get_field_keys():
-                    if key not in entry_counts:
-                        entry_counts[key] = 0
-                    entry_counts[key] += len(log.get_field(key).get_timestamps())
+        if all_entry_counts:
+            emit(f"\nCaptured logs by entry name:")
+            entry_counts = Counter()
+            for log_entry_counts in all_entry_counts:
+                entry_counts.update(log_entry_counts)
 
             for entry_name in sorted(entry_counts.keys()):
-                print(f"  {entry_name}: {entry_counts[entry_name]} records")
+                emit(f"  {entry_name}: {entry_counts[entry_name]} records")
         else:
-            print("No records captured matching the specified entry names.")
+            emit("No records captured matching the specified entry names.")
+    flush_output()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,135 @@
+import array
+import unittest
+
+from Log import Log, LoggableType
+
+
+# A pair of distinct values for each type that can be written to a log
+SAMPLE_VALUES = {
+    LoggableType.RAW: (b"\x01\x02", b""),
+    LoggableType.BOOLEAN: (True, False),
+    LoggableType.NUMBER: (1.5, -2.0),
+    LoggableType.STRING: ("first", "second"),
+    LoggableType.BOOLEAN_ARRAY: ([True, False], [False]),
+    LoggableType.NUMBER_ARRAY: ([1.0, 2.5], [3.0]),
+    LoggableType.STRING_ARRAY: (["a", "b"], []),
+}
+
+
+def put(log: Log, key: str, log_type: LoggableType, timestamp: float, value) -> bool:
+    return getattr(log, "put_" + log_type.value)(key, timestamp, value)
+
+
+def get(log: Log, key: str, log_type: LoggableType, start: float, end: float):
+    return getattr(log, "get_" + log_type.value)(key, start, end)
+
+
+class LogRoundTripTest(unittest.TestCase):
+    def test_put_get_round_trip(self):
+        for log_type, values in SAMPLE_VALUES.items():
+            with self.subTest(log_type=log_type):
+                log = Log()
+                key = "/" + log_type.value
+                self.assertTrue(put(log, key, log_type, 2.0, values[1]))
+                # Out of order values are inserted by timestamp
+                self.assertTrue(put(log, key, log_type, 1.0, values[0]))
+                
+                self.assertEqual(log.get_type(key), log_type)
+                self.assertFalse(log.get_type_warning(key))
+                result = get(log, key, log_type, 0.0, 10.0)
+                self.assertEqual(list(result.timestamps), [1.0, 2.0])
+                self.assertEqual([list(value) if isinstance(value, array.array) else value
+                                  for value in result.values], list(values))
+                self.assertEqual(log.get_timestamp_range(), (1.0, 2.0))
+    
+    def test_empty_field_rejects_values(self):
+        # Empty fields are only placeholders for the children of structured data
+        log = Log()
+        log.create_blank_field("/parent", LoggableType.EMPTY)
+        self.assertEqual(log.get_type("/parent"), LoggableType.EMPTY)
+        self.assertFalse(log.put_number("/parent", 1.0, 1.0))
+        self.assertEqual(log.get_field("/parent").timestamp_count, 0)
+    
+    def test_get_range_excludes_start(self):
+        log = Log()
+        for timestamp in (1.0, 2.0, 3.0, 4.0):
+            log.put_number("/number", timestamp, timestamp * 10)
+        result = log.get_number("/number", 1.0, 3.0)
+        self.assertEqual(list(result.timestamps), [2.0, 3.0])
+        self.assertEqual(list(result.values), [20.0, 30.0])
+    
+    def test_conflicting_type_is_rejected(self):
+        log = Log()
+        self.assertTrue(log.put_number("/value", 1.0, 1.0))
+        self.assertFalse(log.put_string("/value", 2.0, "text"))
+        self.assertTrue(log.get_type_warning("/value"))
+        self.assertEqual(list(log.get_number("/value", 0.0, 10.0).values), [1.0])
+
+
+class LogPutNumberTest(unittest.TestCase):
+    def test_non_numeric_value_is_rejected(self):
+        for value in ("1.0", None, [1.0]):
+            with self.subTest(value=value):
+                log = Log()
+                # Both a new field and the fast path for an existing one
+                self.assertFalse(log.put_number("/new", 1.0, value))
+                self.assertTrue(log.put_number("/existing", 1.0, 1.0))
+                self.assertFalse(log.put_number("/existing", 2.0, value))
+                
+                self.assertTrue(log.get_type_warning("/new"))
+                self.assertTrue(log.get_type_warning("/existing"))
+                self.assertEqual(log.get_field("/new").timestamp_count, 0)
+                existing = log.get_number("/existing", 0.0, 10.0)
+                self.assertEqual(list(existing.timestamps), [1.0])
+                self.assertEqual(list(existing.values), [1.0])
+    
+    def test_integer_and_boolean_values_are_stored_as_doubles(self):
+        log = Log()
+        self.assertTrue(log.put_number("/number", 1.0, 3))
+        self.assertTrue(log.put_number("/number", 2.0, True))
+        self.assertEqual(list(log.get_number("/number", 0.0, 10.0).values), [3.0, 1.0])
+    
+    def test_non_numeric_number_array_is_rejected(self):
+        log = Log()
+        self.assertFalse(log.put_number_array("/array", 1.0, [1.0, "2"]))
+        self.assertTrue(log.get_type_warning("/array"))
+        self.assertEqual(log.get_field("/array").timestamp_count, 0)
+
+
+class LogClearBeforeTimeTest(unittest.TestCase):
+    def test_clear_before_time(self):
+        # Covers each storage type: arrays of doubles, packed booleans, raw
+        # bytes and lists
+        for log_type in (LoggableType.NUMBER, LoggableType.BOOLEAN, LoggableType.RAW, LoggableType.STRING):
+            with self.subTest(log_type=log_type):
+                log = Log()
+                key = "/" + log_type.value
+                first, second = SAMPLE_VALUES[log_type]
+                samples = [(1.0, first), (2.0, second), (3.0, first), (4.0, second)]
+                for timestamp, value in samples:
+                    put(log, key, log_type, timestamp, value)
+                
+                log.clear_before_time(2.5)
+                # The last value before the clear is kept at the clear timestamp
+                result = get(log, key, log_type, 0.0, 10.0)
+                self.assertEqual(list(result.timestamps), [2.5, 3.0, 4.0])
+                self.assertEqual(list(result.values), [second, first, second])
+                self.assertEqual(log.get_timestamp_range(), (2.5, 4.0))
+                
+                # Values can still be written after clearing
+                self.assertTrue(put(log, key, log_type, 5.0, first))
+                result = get(log, key, log_type, 3.5, 10.0)
+                self.assertEqual(list(result.values), [second, first])
+    
+    def test_clear_before_first_timestamp_keeps_all_values(self):
+        log = Log()
+        log.put_number("/number", 2.0, 1.0)
+        log.put_number("/number", 3.0, 2.0)
+        log.clear_before_time(1.0)
+        result = log.get_number("/number", 0.0, 10.0)
+        self.assertEqual(list(result.timestamps), [2.0, 3.0])
+        self.assertEqual(list(result.values), [1.0, 2.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import math
+import struct
+import unittest
+
+from StructDecoder import StructDecoder
+
+
+def make_decoder() -> StructDecoder:
+    """Returns a decoder with Rotation2d, Pose2d and an all-numeric schema,
+    which are flat enough to be decoded by a single precompiled struct."""
+    decoder = StructDecoder()
+    decoder.add_schema("Rotation2d", b"double value")
+    decoder.add_schema("Pose2d", b"double x;double y;Rotation2d rotation")
+    decoder.add_schema("Flat", b"bool enabled;int8 a;uint8 b;int16 c;uint16 d;int32 e;uint32 f;"
+                               b"int64 g;uint64 h;float i;double j")
+    return decoder
+
+
+class StructDecoderFastPathTest(unittest.TestCase):
+    SCHEMAS = ("Rotation2d", "Pose2d", "Flat")
+    
+    def setUp(self):
+        self.fast = make_decoder()
+        self.generic = make_decoder()
+        for name in self.SCHEMAS:
+            self.assertIsNotNone(self.fast._get_unpacker(name))
+            # Disable the precompiled unpacker to decode bit by bit
+            self.generic._unpackers[name] = None
+    
+    def sample_values(self, name: str):
+        size = self.fast.schemas[name].length // 8
+        yield bytes(size)
+        yield bytes(range(1, size + 1))
+        yield bytes(255 - i for i in range(size))
+        if name == "Pose2d":
+            yield struct.pack("<3d", 1.5, -2.25, math.pi)
+    
+    def test_decode_matches_generic_path(self):
+        for name in self.SCHEMAS:
+            for value in self.sample_values(name):
+                with self.subTest(name=name, value=value):
+                    self.assertEqual(self.fast.decode(name, value), self.generic.decode(name, value))
+    
+    def test_decode_array_matches_generic_path(self):
+        for name in self.SCHEMAS:
+            value = b"".join(self.sample_values(name))
+            for data in (value, value + b"\x00", b""):
+                with self.subTest(name=name, length=len(data)):
+                    self.assertEqual(self.fast.decode_array(name, data), self.generic.decode_array(name, data))
+    
+    def test_decode_pose2d(self):
+        result = self.fast.decode("Pose2d", struct.pack("<3d", 1.5, -2.25, 0.5))
+        self.assertEqual(result["data"], {"x": 1.5, "y": -2.25, "rotation": {"value": 0.5}})
+        self.assertEqual(result["schema_types"], {"rotation": "Rotation2d"})
+    
+    def test_decode_unknown_schema(self):
+        with self.assertRaises(ValueError):
+            self.fast.decode("Unknown", b"")
+        with self.assertRaises(ValueError):
+            self.fast.decode_array("Unknown", b"")
+
+
+if __name__ == "__main__":
+    unittest.main()